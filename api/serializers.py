@@ -0,0 +1,94 @@
+"""Сериализация без DRF и без обхода полей модели.
+
+Ленты читаются через ``.values()`` с фиксированным набором колонок,
+а каждая строка превращается в словарь одним литералом: ни объектов
+модели, ни FieldFile для картинок на каждый пост.
+"""
+from django.conf import settings
+
+from posts.thumbnails import enqueue, lookup_thumbnail
+from posts.variants import variant_urls
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'comments_count',
+    'image', 'image_width', 'image_height',
+    'author__username', 'author__first_name', 'author__last_name',
+    'group__slug', 'group__title',
+)
+COMMENT_FIELDS = ('id', 'text', 'created', 'author__username')
+
+
+def serialize_image(name, width, height):
+    if not name:
+        return None
+    data = {
+        'url': settings.MEDIA_URL + name,
+        'width': width,
+        'height': height,
+        'thumbnail': None,
+        'variants': None,
+    }
+    urls = variant_urls(name)
+    if urls is not None:
+        data['variants'] = {
+            extension: {str(size): url for size, url in by_width.items()}
+            for extension, by_width in urls.items()
+        }
+        return data
+    thumbnail = lookup_thumbnail(name)
+    if thumbnail is None:
+        enqueue(name)
+    else:
+        data['thumbnail'] = thumbnail.url
+    return data
+
+
+def serialize_post(row):
+    group_slug = row['group__slug']
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'].isoformat(),
+        'comments_count': row['comments_count'],
+        'author': {
+            'username': row['author__username'],
+            'first_name': row['author__first_name'],
+            'last_name': row['author__last_name'],
+        },
+        'group': {
+            'slug': group_slug,
+            'title': row['group__title'],
+        } if group_slug else None,
+        'image': serialize_image(
+            row['image'], row['image_width'], row['image_height']
+        ),
+    }
+
+
+def serialize_comment(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'created': row['created'].isoformat(),
+        'author': row['author__username'],
+    }
+
+
+def serialize_author(user):
+    stats = getattr(user, 'stats', None)
+    return {
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'posts_count': stats.posts_count if stats else 0,
+        'followers_count': stats.followers_count if stats else 0,
+        'following_count': stats.following_count if stats else 0,
+    }
+
+
+def serialize_page(page, serializer):
+    return {
+        'results': [serializer(row) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
@@ -0,0 +1,163 @@
+import shutil
+import tempfile
+from http import HTTPStatus
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from posts.querycount import assert_query_budget
+from posts.tests.test_thumbnails import make_image
+from posts.variants import generate_variants
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author',
+            first_name='Лев',
+            last_name='Толстой'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Заголовок тестовой группы',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Текст поста {i}',
+                author=cls.author,
+                group=cls.group
+            )
+            for i in range(settings.PAGINATOR + 3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0],
+            author=cls.reader,
+            text='Текст комментария'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        cache.clear()
+
+    def test_feeds_paginated_by_cursor(self):
+        '''Ленты API отдаются порциями по курсору без повторов'''
+        urls = (
+            reverse('api:index'),
+            reverse('api:group', args=[self.group.slug]),
+            reverse('api:profile', args=[self.author.username]),
+        )
+        expected = [post.id for post in reversed(self.posts)]
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url).json()
+                self.assertEqual(len(first['results']), settings.PAGINATOR)
+                self.assertIsNone(first['previous'])
+                second = self.guest_client.get(
+                    url, {'after': first['next']}
+                ).json()
+                self.assertIsNone(second['next'])
+                ids = [item['id'] for item in first['results']
+                       + second['results']]
+                self.assertEqual(ids, expected)
+
+    def test_post_serialized(self):
+        '''Пост отдаётся с автором, группой и комментариями'''
+        post = self.posts[0]
+        data = self.guest_client.get(reverse('api:post', args=[post.id]))
+        data = data.json()
+        self.assertEqual(data['post']['text'], post.text)
+        self.assertEqual(data['post']['author']['last_name'], 'Толстой')
+        self.assertEqual(data['post']['group']['slug'], self.group.slug)
+        self.assertEqual(data['post']['comments_count'], 1)
+        self.assertEqual(
+            data['comments']['results'][0]['author'],
+            self.reader.username
+        )
+
+    def test_image_urls(self):
+        '''Для картинки отдаются адреса готовых вариантов'''
+        post = Post.objects.create(
+            text='Пост с картинкой',
+            author=self.author,
+            image=make_image()
+        )
+        url = reverse('api:post', args=[post.id])
+        with mock.patch('api.serializers.enqueue') as enqueue:
+            image = self.guest_client.get(url).json()['post']['image']
+        enqueue.assert_called_once_with(post.image.name)
+        self.assertIsNone(image['variants'])
+        generate_variants(post.image.name)
+        cache.clear()
+        image = self.guest_client.get(url).json()['post']['image']
+        self.assertTrue(image['variants']['webp']['320'].endswith('.webp'))
+
+    def test_etag_revalidation(self):
+        '''Повторный запрос с ETag получает 304 без обращения к базе'''
+        url = reverse('api:index')
+        response = self.guest_client.get(url)
+        with assert_query_budget('api:index', budget=0):
+            repeat = self.guest_client.get(
+                url,
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(repeat.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_follow_requires_login(self):
+        '''Лента подписок доступна только авторизованным'''
+        response = self.guest_client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        data = self.reader_client.get(reverse('api:follow_index')).json()
+        self.assertEqual(data['results'][0]['id'], self.posts[-1].id)
+
+    def test_read_only(self):
+        '''API не принимает записи'''
+        response = self.reader_client.post(reverse('api:index'))
+        self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+
+    def test_within_budget(self):
+        '''Запросы к базе не зависят от числа постов на странице'''
+        urls = {
+            'api:index': reverse('api:index'),
+            'api:group': reverse('api:group', args=[self.group.slug]),
+            'api:profile': reverse('api:profile', args=[self.author.username]),
+            'api:post': reverse('api:post', args=[self.posts[0].id]),
+            'api:follow_index': reverse('api:follow_index'),
+        }
+        for url_name, url in urls.items():
+            with self.subTest(url_name=url_name):
+                cache.clear()
+                with assert_query_budget(url_name):
+                    self.reader_client.get(url)
+
+    def test_profile_prefix(self):
+        '''Профиль пользователя с именем фиксированного адреса доступен'''
+        User.objects.create_user(username='follow')
+        url = reverse('api:profile', args=['follow'])
+        self.assertEqual(url, '/api/v1/users/follow/')
+        data = self.guest_client.get(url).json()
+        self.assertEqual(data['author']['username'], 'follow')
+
+    def test_not_found(self):
+        '''Несуществующие объекты дают JSON 404'''
+        response = self.guest_client.get(reverse('api:post', args=[0]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertIn('detail', response.json())
@@ -0,0 +1,20 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('posts/<int:post_id>/', views.post_view, name='post'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
+    path('group/<slug>/', views.group_posts, name='group'),
+    path('follow/', views.follow_index, name='follow_index'),
+    # отдельный префикс: пользователь «follow» или «posts» не перекроет
+    # фиксированные адреса и не спрячется за ними
+    path('users/<str:username>/', views.profile, name='profile'),
+]
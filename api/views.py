@@ -0,0 +1,150 @@
+from django.contrib.auth import get_user_model
+from django.db.models import BooleanField, Value
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_safe
+
+from posts.archive import archived_follow_feed, get_post_or_404
+from posts.cache import versioned_cache
+from posts.feed import follow_feed
+from posts.models import ArchivedComment, ArchivedPost, Comment, Group, Post
+from posts.paginators import CursorPaginator
+from yatube.settings import COMMENT_PER_PAGE, PAGINATOR
+
+from .serializers import (COMMENT_FIELDS, POST_FIELDS, serialize_author,
+                          serialize_comment, serialize_page, serialize_post)
+
+User = get_user_model()
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')}
+    )
+
+
+def not_found():
+    return json_response({'detail': 'Не найдено'}, status=404)
+
+
+def posts_page(request, posts, archive):
+    # архивные строки идут за горячими, как в лентах сайта
+    paginator = CursorPaginator(
+        posts.values(*POST_FIELDS),
+        PAGINATOR,
+        archive=archive.values(*POST_FIELDS)
+    )
+    page = paginator.get_page(
+        request.GET.get('after'),
+        request.GET.get('before')
+    )
+    return serialize_page(page, serialize_post)
+
+
+def get_post_row(post_id, *fields):
+    """Строка поста из Post или архива и выборка его комментариев.
+
+    Комментарии архивного поста переезжают вместе с ним, поэтому они
+    читаются из той же таблицы, где нашёлся пост.
+    """
+    row = get_post_or_404(
+        Post.objects.values(*fields),
+        ArchivedPost.objects.values(
+            *fields, is_archived=Value(True, output_field=BooleanField())
+        ),
+        pk=post_id
+    )
+    model = ArchivedComment if row.pop('is_archived', False) else Comment
+    return row, model.objects.filter(post_id=post_id)
+
+
+def comments_page(request, comments):
+    paginator = CursorPaginator(
+        comments.values(*COMMENT_FIELDS),
+        COMMENT_PER_PAGE,
+        fields=('created', 'id')
+    )
+    page = paginator.get_page(request.GET.get('after'))
+    return serialize_page(page, serialize_comment)
+
+
+@require_safe
+@versioned_cache('api')
+def index(request):
+    return json_response(
+        posts_page(request, Post.objects.all(), ArchivedPost.objects.all())
+    )
+
+
+@require_safe
+@versioned_cache('api')
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).first()
+    if group is None:
+        return not_found()
+    return json_response({
+        'group': {
+            'slug': group.slug,
+            'title': group.title,
+            'description': group.description,
+        },
+        **posts_page(
+            request,
+            Post.objects.filter(group=group),
+            ArchivedPost.objects.filter(group=group)
+        ),
+    })
+
+
+@require_safe
+@versioned_cache('api')
+def profile(request, username):
+    author = User.objects.select_related('stats').filter(
+        username=username
+    ).first()
+    if author is None:
+        return not_found()
+    return json_response({
+        'author': serialize_author(author),
+        **posts_page(
+            request,
+            Post.objects.filter(author=author),
+            ArchivedPost.objects.filter(author=author)
+        ),
+    })
+
+
+@require_safe
+@versioned_cache('api')
+def post_view(request, post_id):
+    try:
+        row, comments = get_post_row(post_id, *POST_FIELDS)
+    except Http404:
+        return not_found()
+    return json_response({
+        'post': serialize_post(row),
+        'comments': comments_page(request, comments),
+    })
+
+
+@require_safe
+@versioned_cache('api')
+def post_comments(request, post_id):
+    try:
+        _, comments = get_post_row(post_id, 'id')
+    except Http404:
+        return not_found()
+    return json_response(comments_page(request, comments))
+
+
+@require_safe
+@versioned_cache('api', per_user=True)
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return json_response({'detail': 'Нужна авторизация'}, status=401)
+    return json_response(posts_page(
+        request,
+        follow_feed(request.user),
+        archived_follow_feed(request.user)
+    ))
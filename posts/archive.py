@@ -0,0 +1,168 @@
+"""Горячая таблица постов и архив.
+
+Посты старше ARCHIVE_AFTER_DAYS вместе с комментариями переносятся
+командой ``archive_posts`` в ArchivedPost и ArchivedComment с теми же id.
+Ленты и страницы постов сначала читают Post, а в архив идут, только
+когда горячих строк не хватило, поэтому индексы и кэш Post остаются
+маленькими.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.http import Http404
+
+from .cache import bump_feed_version, bump_scope_versions, scope_version
+from .feeds import author_scope, group_scope, groups_scope, site_scope
+from .following import followed_ids
+from .models import (ArchivedComment, ArchivedPost, Comment, FeedEntry,
+                     GroupStats, Post, PostTrend)
+
+ARCHIVE_SCOPE = 'archive'
+ARCHIVE_BATCH = 500
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author_id', 'group_id', 'image',
+    'image_width', 'image_height', 'comments_count',
+)
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def archived_count(queryset):
+    """COUNT(*) архивной выборки из кэша.
+
+    Архив меняется только командой archive_posts, она и сдвигает версию.
+    """
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        # например, лента подписок без подписок
+        return 0
+    digest = hashlib.md5(sql.encode()).hexdigest()
+    key = f'archive:count:{scope_version(ARCHIVE_SCOPE)}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, None)
+    return count
+
+
+class HotThenArchive:
+    """Список для Paginator: строки Post, за ними строки архива.
+
+    Архивные посты старше любых горячих, поэтому порядок по дате
+    сохраняется, а архив читается только страницами за концом Post.
+    """
+
+    def __init__(self, hot, archive):
+        self.hot = hot
+        self.archive = archive
+        self._hot_count = None
+
+    @property
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count + archived_count(self.archive)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        start, stop = index.start or 0, index.stop
+        rows = []
+        if start < self.hot_count:
+            rows += self.hot[start:min(stop, self.hot_count)]
+        if stop > self.hot_count:
+            rows += self.archive[
+                max(start - self.hot_count, 0):stop - self.hot_count
+            ]
+        return rows
+
+
+def archived_follow_feed(user):
+    # FeedEntry для архивных постов удалены, авторы берутся из кэша подписок
+    return ArchivedPost.objects.filter(author_id__in=followed_ids(user.pk))
+
+
+def get_post_or_404(hot, archive, **lookup):
+    """Пост из горячей таблицы, иначе из архива, иначе 404."""
+    for queryset in (hot, archive):
+        try:
+            return queryset.get(**lookup)
+        except queryset.model.DoesNotExist:
+            pass
+    raise Http404('Запись не найдена')
+
+
+def _delete(model, column, ids):
+    # сырой DELETE: сигналы Post уменьшили бы счётчики автора и групп,
+    # а архивные посты в них по-прежнему учитываются
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {model._meta.db_table} '
+            f'WHERE {column} IN ({placeholders})',
+            ids
+        )
+
+
+def archive_chunk(ids):
+    """Переносит посты с этими id и их комментарии в архив.
+
+    Возвращает области RSS/Atom-лент (posts.feeds), из которых ушли посты.
+    """
+    with transaction.atomic():
+        scopes = set()
+        for username, slug in Post.objects.filter(pk__in=ids).values_list(
+                'author__username', 'group__slug').distinct():
+            scopes.add(author_scope(username))
+            if slug is not None:
+                # last_post группы обнуляется ниже, каталог тоже меняется
+                scopes.update((group_scope(slug), groups_scope()))
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**row)
+            for row in Post.objects.filter(pk__in=ids).values(*POST_FIELDS)
+        )
+        ArchivedComment.objects.bulk_create(
+            (
+                ArchivedComment(**row)
+                for row in Comment.objects.filter(post_id__in=ids).values(
+                    *COMMENT_FIELDS
+                )
+            ),
+            batch_size=ARCHIVE_BATCH
+        )
+        GroupStats.objects.filter(last_post_id__in=ids).update(last_post=None)
+        _delete(FeedEntry, 'post_id', ids)
+        _delete(PostTrend, 'post_id', ids)
+        _delete(Comment, 'post_id', ids)
+        _delete(Post, 'id', ids)
+    return scopes
+
+
+def archive_posts(cutoff, chunk_size=ARCHIVE_BATCH):
+    """Переносит в архив посты старше cutoff порциями по chunk_size.
+
+    Каждая порция — отдельная транзакция, так что писатели ждут
+    блокировку SQLite недолго. Возвращает число перенесённых постов.
+    """
+    moved = 0
+    scopes = {ARCHIVE_SCOPE, site_scope()}
+    old_posts = Post.objects.filter(pub_date__lt=cutoff).order_by(
+        'pub_date', 'pk'
+    ).values_list('pk', flat=True)
+    while True:
+        ids = list(old_posts[:chunk_size])
+        if not ids:
+            break
+        scopes |= archive_chunk(ids)
+        moved += len(ids)
+    if moved:
+        bump_scope_versions(*scopes)
+        bump_feed_version()
+    return moved
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с прагмами из SQLITE_PRAGMAS и BEGIN IMMEDIATE для записей.
+
+    Обычный atomic() открывает отложенную транзакцию: если в ней сначала
+    было чтение, а к моменту записи базу уже поменял другой писатель,
+    SQLite сразу отвечает «database is locked», не дожидаясь timeout.
+    IMMEDIATE берёт блокировку на запись в начале транзакции, и тогда
+    конкуренты честно ждут в очереди.
+    """
+
+    immediate_transactions = False
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            self.connection.execute(f'PRAGMA {name} = {value}')
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(
+            'BEGIN IMMEDIATE' if self.immediate_transactions else 'BEGIN'
+        )
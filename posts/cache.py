@@ -0,0 +1,185 @@
+import datetime
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.views.decorators.http import condition
+
+FEED_VERSION_KEY = 'feed:version'
+
+
+def _new_version():
+    # после вытеснения ключа версия не должна совпасть со старой
+    return int(time.time() * 1000)
+
+
+def feed_version():
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, _new_version(), None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def bump_feed_version():
+    """Инвалидирует все закэшированные ленты одним инкрементом."""
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.set(FEED_VERSION_KEY, _new_version(), None)
+
+
+def scope_key(scope):
+    return f'version:{scope}'
+
+
+def scope_version(scope):
+    """Версия одной области ('site', 'group:<slug>', 'author:<username>').
+
+    Это время последней записи в миллисекундах, поэтому из неё же
+    получается Last-Modified без запроса к базе.
+    """
+    key = scope_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_scope_versions(*scopes):
+    keys = [scope_key(scope) for scope in scopes]
+    current = cache.get_many(keys)
+    now = _new_version()
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys},
+        None
+    )
+
+
+def page_key(request, page):
+    if getattr(page, 'is_cursor', False):
+        after = request.GET.get('after', '')
+        before = request.GET.get('before', '')
+        return f'a{after}b{before}'
+    return f'p{page.number}'
+
+
+def auth_variant(request):
+    if request.user.is_authenticated:
+        return f'u{request.user.pk}'
+    return 'anon'
+
+
+def feed_cache(request, feed, page):
+    """Контекст для ``{% cache %}`` вокруг цикла постов в ленте."""
+    key = ':'.join((
+        feed,
+        str(feed_version()),
+        page_key(request, page),
+        auth_variant(request),
+    ))
+    return {
+        'feed_cache_key': key,
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
+    }
+
+
+def versioned_cache(prefix, per_user=False):
+    """Кэширует GET-ответ целиком и отвечает 304 по ETag.
+
+    ETag строится из версии лент и адреса, поэтому совпадающий
+    ``If-None-Match`` получает 304 без обращения к view и шаблонам.
+    Last-Modified не отдаётся: правка, комментарий или удаление не
+    меняют дат постов, и клиент с одним If-Modified-Since получал бы
+    304 на устаревшую страницу. С ``per_user`` у каждого пользователя
+    своя копия ответа.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            parts = [
+                prefix,
+                str(feed_version()),
+                hashlib.md5(request.get_full_path().encode()).hexdigest(),
+            ]
+            if per_user:
+                parts.append(auth_variant(request))
+            return serve_cached(
+                view, ':'.join(parts), None, request, *args, **kwargs
+            )
+        return wrapper
+    return decorator
+
+
+def serve_cached(view, key, last_modified_func, request, *args, **kwargs):
+    """Отдаёт ответ view из кэша по ключу, а по ETag из ключа — 304."""
+    etag = hashlib.md5(key.encode()).hexdigest()
+
+    @condition(
+        etag_func=lambda *args, **kwargs: etag,
+        last_modified_func=last_modified_func
+    )
+    def cached_view(request, *args, **kwargs):
+        response = cache.get(key)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    return cached_view(request, *args, **kwargs)
+
+
+def scoped_cache(scope_func, anonymous_only=False):
+    """Кэш ответа до следующей записи в своей области.
+
+    ``scope_func(**kwargs)`` по аргументам view называет область.
+    ETag и Last-Modified берутся из её версии, поэтому опрос без
+    изменений получает 304, не трогая базу. С ``anonymous_only``
+    авторизованные пользователи получают свою страницу.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or (
+                    anonymous_only and request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            scope = scope_func(**kwargs)
+            version = scope_version(scope)
+            modified = datetime.datetime.fromtimestamp(
+                version // 1000, datetime.timezone.utc
+            )
+            key = ':'.join((
+                'scoped',
+                scope,
+                str(version),
+                hashlib.md5(request.get_full_path().encode()).hexdigest(),
+            ))
+            return serve_cached(
+                view, key, lambda *args, **kwargs: modified,
+                request, *args, **kwargs
+            )
+        return wrapper
+    return decorator
+
+
+def anonymous_page_cache():
+    """Страница целиком для анонимов (см. ``versioned_cache``).
+
+    Авторизованные пользователи всегда получают свою страницу.
+    """
+    def decorator(view):
+        cached_view = versioned_cache('page')(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            return cached_view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,149 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import (ArchivedPost, Comment, Follow, Group, GroupStats, Post,
+                     UserStats)
+
+User = get_user_model()
+
+RECOUNT_BATCH = 500
+
+
+def change_comments_count(post_id, delta):
+    # как в change_user_stats: разошедшийся счётчик не уходит ниже нуля,
+    # иначе CHECK положительного поля ломает удаление комментария
+    floor = {'comments_count__gte': -delta} if delta < 0 else {}
+    Post.objects.filter(pk=post_id, **floor).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def change_user_stats(user_id, **deltas):
+    """Атомарно сдвигает счётчики пользователя через F()-выражения.
+
+    Строку статистики создаёт сигнал при регистрации (или миграция для
+    старых пользователей), поэтому здесь всегда один UPDATE. Если строки
+    нет, например после bulk_create, её создаст ``recount_counters``, он же
+    исправит и пропущенные здесь уменьшения.
+    """
+    # разошедшийся счётчик не уходит ниже нуля
+    floors = {
+        f'{field}__gte': -delta
+        for field, delta in deltas.items() if delta < 0
+    }
+    UserStats.objects.filter(user_id=user_id, **floors).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+
+
+def add_group_post(post):
+    """Новый пост всегда самый свежий в своей группе."""
+    updated = GroupStats.objects.filter(group_id=post.group_id).update(
+        posts_count=F('posts_count') + 1,
+        last_post=post,
+        last_activity=post.pub_date,
+    )
+    if not updated:
+        refresh_group_stats(post.group_id)
+
+
+def refresh_group_stats(group_id):
+    """Пересчитывает строку группы по индексу (group, -pub_date).
+
+    Нужен, когда пост уходит из группы: при удалении или переносе
+    предыдущий пост заранее неизвестен. Архивные посты входят в число
+    записей, но превью показывается только для горячего поста.
+    """
+    posts = Post.objects.filter(group_id=group_id)
+    archived = ArchivedPost.objects.filter(group_id=group_id)
+    last = posts.order_by('-pub_date', '-pk').values('pk', 'pub_date').first()
+    if last is None:
+        last_activity = archived.order_by('-pub_date').values_list(
+            'pub_date', flat=True
+        ).first()
+    else:
+        last_activity = last['pub_date']
+    GroupStats.objects.update_or_create(group_id=group_id, defaults={
+        'posts_count': posts.count() + archived.count(),
+        'last_post_id': last and last['pk'],
+        'last_activity': last_activity,
+    })
+
+
+def count_subquery(queryset, field):
+    """COUNT(*) связанных строк для каждой строки внешнего запроса."""
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+        field
+    ).annotate(count=Count('pk')).values('count')
+    return Coalesce(
+        Subquery(counts, output_field=IntegerField()),
+        0
+    )
+
+
+def _fix_drifted(queryset, expressions):
+    """Переписывает только те строки, где счётчики разошлись с данными."""
+    drifted = queryset.annotate(**{
+        f'real_{field}': expression
+        for field, expression in expressions.items()
+    }).exclude(**{
+        field: F(f'real_{field}') for field in expressions
+    }).values_list('pk', flat=True)
+    drifted = list(drifted)
+    for start in range(0, len(drifted), RECOUNT_BATCH):
+        queryset.filter(
+            pk__in=drifted[start:start + RECOUNT_BATCH]
+        ).update(**expressions)
+    return len(drifted)
+
+
+def recount_comments():
+    return _fix_drifted(Post.objects.all(), {
+        'comments_count': count_subquery(Comment.objects.all(), 'post'),
+    })
+
+
+def recount_user_stats():
+    missing = User.objects.filter(stats__isnull=True).values_list(
+        'pk', flat=True
+    )
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=user_id) for user_id in missing.iterator()),
+        batch_size=RECOUNT_BATCH
+    )
+    return _fix_drifted(UserStats.objects.all(), {
+        'posts_count': (
+            count_subquery(Post.objects.all(), 'author')
+            + count_subquery(ArchivedPost.objects.all(), 'author')
+        ),
+        'followers_count': count_subquery(Follow.objects.all(), 'author'),
+        'following_count': count_subquery(Follow.objects.all(), 'user'),
+    })
+
+
+def recount_group_stats():
+    missing = Group.objects.filter(stats__isnull=True).values_list(
+        'pk', flat=True
+    )
+    GroupStats.objects.bulk_create(
+        (GroupStats(group_id=group_id) for group_id in missing.iterator()),
+        batch_size=RECOUNT_BATCH
+    )
+    latest = Post.objects.filter(group=OuterRef('pk')).order_by(
+        '-pub_date', '-pk'
+    )
+    archived = ArchivedPost.objects.filter(group=OuterRef('pk')).order_by(
+        '-pub_date'
+    )
+    return _fix_drifted(GroupStats.objects.all(), {
+        'posts_count': (
+            count_subquery(Post.objects.all(), 'group')
+            + count_subquery(ArchivedPost.objects.all(), 'group')
+        ),
+        'last_post': Subquery(latest.values('pk')[:1]),
+        'last_activity': Coalesce(
+            Subquery(latest.values('pub_date')[:1]),
+            Subquery(archived.values('pub_date')[:1]),
+        ),
+    })
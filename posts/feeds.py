@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.html import linebreaks
+
+from .cache import scoped_cache
+from .models import Group, Post
+
+User = get_user_model()
+
+
+def site_scope():
+    return 'site'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def groups_scope():
+    # каталог групп: меняется при записи в любой группе
+    return 'groups'
+
+
+class PostFeed(Feed):
+    """Общая часть лент: пост — это запись с текстом и автором."""
+
+    def posts(self, obj):
+        return Post.objects.for_feed()
+
+    def items(self, obj):
+        return self.posts(obj)[:settings.SYNDICATION_ITEMS]
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return linebreaks(item.text)
+
+    def item_link(self, item):
+        return reverse('post', args=[item.author.username, item.id])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+@method_decorator(scoped_cache(site_scope), name='__call__')
+class LatestPostsFeed(PostFeed):
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+
+    def link(self):
+        return reverse('index')
+
+
+@method_decorator(scoped_cache(group_scope), name='__call__')
+class GroupFeed(PostFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def posts(self, obj):
+        return super().posts(obj).filter(group=obj)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('group', args=[obj.slug])
+
+
+@method_decorator(scoped_cache(author_scope), name='__call__')
+class AuthorFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def posts(self, obj):
+        return super().posts(obj).filter(author=obj)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Записи автора {obj.username}'
+
+    def link(self, obj):
+        return reverse('profile', args=[obj.username])
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupAtomFeed(GroupFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
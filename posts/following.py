@@ -0,0 +1,52 @@
+"""Кэш множества авторов, на которых подписан пользователь.
+
+Множество загружается из базы один раз и дальше правится на месте
+сигналами Follow после коммита, так что откаченная подписка в кэш не
+попадает. Решения о записи по кэшу не принимаются: profile_follow и
+profile_unfollow всегда пишут в базу и поправляют кэш, если он отстал.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+
+def following_key(user_id):
+    return f'following:{user_id}'
+
+
+def followed_ids(user_id):
+    """frozenset id авторов, на которых подписан пользователь."""
+    key = following_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Follow.objects.filter(user_id=user_id).values_list(
+            'author_id', flat=True
+        ))
+        cache.set(key, ids, settings.FOLLOWING_CACHE_TIMEOUT)
+    return ids
+
+
+def is_following(user_id, author_id):
+    return author_id in followed_ids(user_id)
+
+
+def _update(user_id, change):
+    key = following_key(user_id)
+    ids = cache.get(key)
+    # незагруженное множество загрузится целиком при первом чтении
+    if ids is not None:
+        cache.set(key, change(ids), settings.FOLLOWING_CACHE_TIMEOUT)
+
+
+def add_followed(user_id, author_id):
+    _update(user_id, lambda ids: ids | {author_id})
+
+
+def remove_followed(user_id, author_id):
+    _update(user_id, lambda ids: ids - {author_id})
+
+
+def forget(user_id):
+    """Сбрасывает множество, например для нового пользователя с тем же id."""
+    cache.delete(following_key(user_id))
@@ -1,9 +1,32 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
 from .models import Comment, Post
+from .uploads import process_image
 
 
 class PostForm(forms.ModelForm):
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if not image:
+            self.instance.image_width = self.instance.image_height = None
+            return image
+        if not isinstance(image, UploadedFile):
+            return image
+        image, width, height = process_image(image)
+        self.instance.image_width = width
+        self.instance.image_height = height
+        return image
+
+    def save(self, commit=True):
+        post = super().save(commit)
+        image = self.cleaned_data.get('image')
+        if commit and isinstance(image, UploadedFile):
+            # storage уже перенёс временный файл: закрываем сами, иначе
+            # сборщик мусора пытается удалить его и пишет FileNotFoundError
+            image.close()
+        return post
+
     class Meta:
         model = Post
         fields = ('group', 'text', 'image')
@@ -0,0 +1,84 @@
+"""Живые уведомления о новых постах (SSE и long-poll).
+
+Внутри процесса новый пост будит ждущие потоки через ``Hub``. Посты,
+сохранённые другими воркерами, находятся дешёвым запросом по первичному
+ключу раз в LIVE_POLL_INTERVAL: таблица постов и есть общий журнал.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+
+from .models import Post
+
+
+class Hub:
+    """Pub/sub в пределах процесса: только «появился пост N»."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.latest = 0
+
+    def publish(self, post_id):
+        with self._condition:
+            self.latest = max(self.latest, post_id)
+            self._condition.notify_all()
+
+    def wait(self, seen, timeout):
+        """Ждёт публикации новее ``seen``, но не дольше timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self.latest > seen, timeout
+            )
+
+
+hub = Hub()
+
+
+def latest_post_id():
+    return Post.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+
+
+def new_posts(since, author_ids=None):
+    """Сколько постов новее since (у авторов из author_ids) и id последнего."""
+    posts = Post.objects.filter(pk__gt=since)
+    if author_ids is not None:
+        posts = posts.filter(author_id__in=author_ids)
+    result = posts.aggregate(count=Count('pk'), last_id=Max('pk'))
+    # ожидающий поток не должен держать соединение с базой
+    if not connection.in_atomic_block:
+        connection.close()
+    return result['count'], result['last_id'] or since
+
+
+def wait_for_posts(since, author_ids, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        seen = hub.latest
+        count, last_id = new_posts(since, author_ids)
+        remaining = deadline - time.monotonic()
+        if count or remaining <= 0:
+            return count, last_id
+        hub.wait(seen, min(settings.LIVE_POLL_INTERVAL, remaining))
+
+
+def event_stream(since, author_ids):
+    """События SSE до LIVE_STREAM_TIMEOUT, потом клиент переподключится."""
+    yield 'retry: 5000\n\n'
+    deadline = time.monotonic() + settings.LIVE_STREAM_TIMEOUT
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        count, last_id = wait_for_posts(
+            since, author_ids, min(settings.LIVE_HEARTBEAT, remaining)
+        )
+        if count:
+            data = json.dumps({'count': count, 'last_id': last_id})
+            yield f'id: {last_id}\nevent: posts\ndata: {data}\n\n'
+            since = last_id
+        else:
+            yield ': ping\n\n'
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import ARCHIVE_BATCH, archive_posts
+
+
+class Command(BaseCommand):
+    help = ('Переносит посты старше ARCHIVE_AFTER_DAYS вместе с '
+            'комментариями в архивные таблицы. Запускайте по cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Возраст поста в днях, после которого он уходит в архив'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=ARCHIVE_BATCH,
+            help='Постов за одну транзакцию'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        moved = archive_posts(cutoff, options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено в архив постов: {moved}'
+        ))
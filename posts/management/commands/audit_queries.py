@@ -0,0 +1,109 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.management.commands import benchmark
+from posts.querycount import QueryRecorder, fingerprint
+
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE')
+
+
+def plan_problems(plan):
+    """Полные сканы таблиц и сортировки во временном B-дереве."""
+    # выдачу FTS5 по рангу можно отсортировать только после поиска
+    if any('VIRTUAL TABLE' in detail for detail in plan):
+        return []
+    problems = []
+    for detail in plan:
+        words = detail.split()
+        if words[0] == 'SCAN' and 'USING' not in words and (
+                'CONSTANT' not in words):
+            problems.append(detail)
+        elif 'TEMP B-TREE' in detail:
+            problems.append(detail)
+    return problems
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class Command(benchmark.Command):
+    help = ('Проходит по страницам posts.views, делает EXPLAIN QUERY PLAN '
+            'для каждого запроса и отмечает полные сканы и сортировки. '
+            'Все записи откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Показывать и запросы без замечаний'
+        )
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Завершаться с ошибкой, если есть замечания'
+        )
+
+    def requests(self, user):
+        specs = super().requests(user)
+        method, url, data = specs['post']
+        specs['post_edit'] = ('get', f'{url}edit/', None)
+        specs['search'] = ('get', reverse('search'), {'q': 'кот'})
+        specs['groups'] = ('get', reverse('groups'), None)
+        specs['trending'] = ('get', reverse('trending'), None)
+        if 'group' in specs:
+            specs['group_trending'] = (
+                'get', f"{specs['group'][1]}trending/", None
+            )
+        author = url.strip('/').split('/')[0]
+        specs['profile_follow'] = (
+            'get', reverse('profile_follow', args=[author]), None
+        )
+        return specs
+
+    def audit(self, client, method, url, data):
+        cache.clear()
+        with QueryRecorder(capture=True).record() as recorder:
+            getattr(client, method)(url, data)
+        seen, report = set(), []
+        for sql, params in recorder.queries:
+            key = fingerprint(sql)
+            if key in seen or not sql.lstrip().upper().startswith(EXPLAINED):
+                continue
+            seen.add(key)
+            plan = explain(sql, params)
+            report.append({
+                'sql': sql,
+                'plan': plan,
+                'problems': plan_problems(plan),
+            })
+        return report
+
+    # иначе вместо запросов view в отчёт попал бы ответ 429
+    @override_settings(RATELIMIT_ENABLED=False)
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN есть только у SQLite')
+        user = self.pick_user(options['username'])
+        client = Client()
+        client.force_login(user)
+        results, problems = {}, 0
+        with transaction.atomic():
+            for name, (method, url, data) in self.requests(user).items():
+                report = self.audit(client, method, url, data)
+                problems += sum(bool(item['problems']) for item in report)
+                results[name] = [
+                    item for item in report
+                    if item['problems'] or options['all']
+                ]
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+        if problems and options['strict']:
+            raise CommandError(f'Запросов с замечаниями: {problems}')
@@ -0,0 +1,154 @@
+import json
+import math
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+from posts.querycount import QueryRecorder
+
+User = get_user_model()
+
+VIEWS = (
+    'index', 'group', 'profile', 'post', 'follow_index',
+    'add_comment', 'new_post',
+)
+
+
+def percentile(values, share):
+    """Перцентиль по методу ближайшего ранга, values отсортированы."""
+    if not values:
+        return None
+    rank = max(math.ceil(share * len(values)), 1)
+    return values[rank - 1]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет основные страницы через тестовый клиент и печатает '
+            'задержки, RPS и число запросов к БД в JSON. '
+            'add_comment и new_post пишут в базу: запускайте на копии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--views', nargs='+', choices=VIEWS, default=VIEWS)
+        parser.add_argument(
+            '--username',
+            help='От чьего имени ходить; по умолчанию самый подписанный'
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Сбрасывать кеш перед каждым запросом'
+        )
+        parser.add_argument('--output', help='Файл для JSON вместо stdout')
+
+    def pick_user(self, username):
+        if username:
+            return User.objects.get(username=username)
+        user = User.objects.order_by(
+            F('stats__following_count').desc(nulls_last=True), 'pk'
+        ).first()
+        if user is None:
+            raise CommandError('База пуста, запустите generate_dataset')
+        return user
+
+    def requests(self, user):
+        post = Post.objects.select_related('author', 'group').order_by(
+            '-comments_count', '-pk'
+        ).first()
+        if post is None:
+            raise CommandError('Нет постов, запустите generate_dataset')
+        group = post.group or Group.objects.filter(
+            posts__isnull=False
+        ).first()
+        author = post.author.username
+        specs = {
+            'index': ('get', reverse('index'), None),
+            'profile': ('get', reverse('profile', args=[author]), None),
+            'post': ('get', reverse('post', args=[author, post.pk]), None),
+            'follow_index': ('get', reverse('follow_index'), None),
+            'add_comment': (
+                'post', reverse('add_comment', args=[author, post.pk]),
+                {'text': 'Комментарий из замера'}
+            ),
+            'new_post': ('post', reverse('new_post'), {
+                'text': 'Пост из замера'
+            }),
+        }
+        if group is not None:
+            specs['group'] = ('get', reverse('group', args=[group.slug]), None)
+        return specs
+
+    def measure(self, client, method, url, data, count, cold):
+        timings, queries = [], []
+        for _ in range(count):
+            if cold:
+                cache.clear()
+            with QueryRecorder().record() as recorder:
+                start = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                timings.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise CommandError(f'{url}: ответ {response.status_code}')
+            queries.append(recorder.count)
+        return timings, queries
+
+    # замеры шлют сотни записей подряд, лимиты им бы помешали
+    @override_settings(RATELIMIT_ENABLED=False)
+    def handle(self, *args, **options):
+        user = self.pick_user(options['username'])
+        client = Client()
+        client.force_login(user)
+        specs = self.requests(user)
+        results = {}
+        for name in options['views']:
+            if name not in specs:
+                self.stderr.write(f'{name}: нет данных, пропускаю')
+                continue
+            method, url, data = specs[name]
+            self.measure(client, method, url, data, options['warmup'], False)
+            timings, queries = self.measure(
+                client, method, url, data,
+                options['requests'], options['cold']
+            )
+            timings.sort()
+            results[name] = {
+                'url': url,
+                'requests': len(timings),
+                'p50_ms': round(percentile(timings, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+                'rps': round(len(timings) / sum(timings), 1),
+                'queries_per_request': round(sum(queries) / len(queries), 2),
+            }
+        report = json.dumps({
+            'commit': current_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'user': user.username,
+            'cold': options['cold'],
+            'views': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                stream.write(report + '\n')
+        else:
+            self.stdout.write(report)
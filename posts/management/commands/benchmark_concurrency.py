@@ -0,0 +1,144 @@
+import json
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.management.commands.benchmark import percentile
+from posts.models import Post
+
+User = get_user_model()
+
+
+def summary(timings, duration):
+    timings = sorted(timings)
+    if not timings:
+        return {'requests': 0}
+    return {
+        'requests': len(timings),
+        'rps': round(len(timings) / duration, 1),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+        'max_ms': round(timings[-1] * 1000, 2),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Меряет задержки чтения без записей и под параллельными '
+            'add_comment/profile_follow. Пишет в базу: запускайте на копии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=5.0)
+
+    def client(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def reader(self, client, urls, stop, timings, errors):
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                response = client.get(random.choice(urls))
+                timings.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+        except Exception as error:
+            errors.append(repr(error))
+        finally:
+            connections.close_all()
+
+    def writer(self, client, posts, authors, stop, timings, errors):
+        try:
+            while not stop.is_set():
+                if random.random() < 0.5:
+                    author, post_id = random.choice(posts)
+                    url = reverse('add_comment', args=[author, post_id])
+                    data = {'text': 'Комментарий из замера'}
+                else:
+                    action = random.choice(
+                        ('profile_follow', 'profile_unfollow')
+                    )
+                    url = reverse(action, args=[random.choice(authors)])
+                    data = None
+                start = time.perf_counter()
+                response = (client.post(url, data) if data
+                            else client.get(url))
+                timings.append(time.perf_counter() - start)
+                if response.status_code != 302:
+                    errors.append(response.status_code)
+        except Exception as error:
+            errors.append(repr(error))
+        finally:
+            connections.close_all()
+
+    def run_phase(self, readers, writers, urls, posts, authors, duration):
+        stop = threading.Event()
+        reads, writes, errors = [], [], []
+        threads = [
+            threading.Thread(
+                target=self.reader,
+                args=(client, urls, stop, reads, errors)
+            )
+            for client in readers
+        ] + [
+            threading.Thread(
+                target=self.writer,
+                args=(client, posts, authors, stop, writes, errors)
+            )
+            for client in writers
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        result = {'reads': summary(reads, duration), 'errors': errors[:10]}
+        if writers:
+            result['writes'] = summary(writes, duration)
+        return result
+
+    # замеры шлют сотни записей подряд, лимиты им бы помешали
+    @override_settings(RATELIMIT_ENABLED=False)
+    def handle(self, *args, **options):
+        users = list(User.objects.order_by('?')[
+            :options['readers'] + options['writers']
+        ])
+        posts = list(Post.objects.order_by('?').values_list(
+            'author__username', 'pk'
+        )[:200])
+        if len(users) < options['readers'] + options['writers'] or not posts:
+            raise CommandError('Мало данных, запустите generate_dataset')
+        urls = [reverse('post', args=post) for post in posts] + [
+            reverse('profile', args=[author]) for author, _ in posts
+        ]
+        authors = sorted({author for author, _ in posts})
+        readers = [self.client(user) for user in users[:options['readers']]]
+        writers = [self.client(user) for user in users[options['readers']:]]
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        connections.close_all()
+
+        duration = options['duration']
+        report = {
+            'journal_mode': journal_mode,
+            'readers': options['readers'],
+            'writers': options['writers'],
+            'reads_only': self.run_phase(
+                readers, [], urls, posts, authors, duration
+            ),
+            'reads_with_writes': self.run_phase(
+                readers, writers, urls, posts, authors, duration
+            ),
+        }
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
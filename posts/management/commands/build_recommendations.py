@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build_recommendations, is_vectorized
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рекомендации «кого подписаться» по графу '
+            'подписок. С numpy и scipy считает разреженными матрицами, '
+            'без них — заметно медленнее.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int,
+            help='Рекомендаций на пользователя, RECOMMENDATIONS_PER_USER'
+        )
+        parser.add_argument(
+            '--weight', type=float,
+            help='Вес co-follow, RECOMMENDATION_COFOLLOW_WEIGHT'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Строк матрицы за одно умножение'
+        )
+
+    def handle(self, *args, **options):
+        if not is_vectorized():
+            self.stderr.write('numpy/scipy не установлены, считаю без них')
+        start = time.perf_counter()
+        count = build_recommendations(
+            options['limit'], options['weight'], options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рекомендаций: {count} за {time.perf_counter() - start:.1f} с'
+        ))
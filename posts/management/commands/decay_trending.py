@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import rebuild_trending, redecay
+
+
+class Command(BaseCommand):
+    help = ('Переносит точку отсчёта популярного на текущий момент и '
+            'удаляет угасшие оценки. Запускайте раз в сутки по cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Пересчитать оценки по постам и комментариям заново'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = rebuild_trending()
+            self.stdout.write(self.style.SUCCESS(
+                f'Пересчитано постов: {count}'
+            ))
+            return
+        removed = redecay()
+        self.stdout.write(self.style.SUCCESS(f'Удалено угасших: {removed}'))
@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.transfer import CREDENTIAL_FIELDS, EXPORT_MODELS, to_json
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает группы, посты, комментарии и подписки в JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки или - для stdout')
+        parser.add_argument(
+            '--media',
+            help='Каталог, куда скопировать картинки постов'
+        )
+        parser.add_argument(
+            '--with-credentials',
+            action='store_true',
+            help='Выгрузить email и хэши паролей пользователей'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def copy_image(self, name, media):
+        source = os.path.join(settings.MEDIA_ROOT, name)
+        target = os.path.join(media, name)
+        if not os.path.isfile(source):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        stream = sys.stdout if path == '-' else open(path, 'w')
+        started = time.perf_counter()
+        total = 0
+        try:
+            for name, model, fields in EXPORT_MODELS:
+                if options['with_credentials']:
+                    fields += CREDENTIAL_FIELDS.get(name, ())
+                rows = model._base_manager.order_by('pk').values(
+                    *fields
+                ).iterator(chunk_size=options['chunk_size'])
+                for row in rows:
+                    if name == 'post' and row['image'] and options['media']:
+                        self.copy_image(row['image'], options['media'])
+                    stream.write(json.dumps(
+                        {'model': name, **row},
+                        ensure_ascii=False,
+                        default=to_json
+                    ))
+                    stream.write('\n')
+                    total += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Выгружено строк: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с)'
+        )
@@ -0,0 +1,157 @@
+import datetime as dt
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post
+from posts.transfer import keep_auto_now_add, rebuild_after_bulk_load
+
+User = get_user_model()
+
+WORDS = (
+    'утро кот город река лес дом дорога книга музыка друг поезд море '
+    'небо ветер снег лето осень весна кофе работа вечер окно сад звезда '
+    'письмо мост парк поле гора остров фото история новость идея'
+).split()
+
+
+def power_law_weights(count, alpha):
+    """Накопленные веса: k-й элемент выбирается с вероятностью ~ 1/k^alpha."""
+    return list(accumulate(1 / (rank + 1) ** alpha for rank in range(count)))
+
+
+class Command(BaseCommand):
+    help = 'Создаёт синтетический набор данных для нагрузочных замеров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного закона для авторов и постов'
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--password', default='bench-password')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def create(self, model, objects):
+        batch_size = self.options['batch_size']
+        batch = []
+        with keep_auto_now_add(model):
+            for obj in objects:
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    with transaction.atomic():
+                        model.objects.bulk_create(batch)
+                    batch = []
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+
+    def text(self, low, high):
+        words = self.random.choices(WORDS, k=self.random.randint(low, high))
+        return ' '.join(words).capitalize()
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = rng = random.Random(options['seed'])
+        prefix = options['prefix']
+        now = timezone.now()
+        started = time.perf_counter()
+
+        password = make_password(options['password'])
+        self.create(User, (
+            User(username=f'{prefix}{i}', password=password,
+                 date_joined=now - dt.timedelta(days=options['days']))
+            for i in range(options['users'])
+        ))
+        user_ids = list(User.objects.filter(
+            username__startswith=prefix
+        ).order_by('pk').values_list('pk', flat=True))
+        # Порядок случайный, чтобы «популярными» не были первые созданные
+        rng.shuffle(user_ids)
+
+        self.create(Group, (
+            Group(title=f'Сообщество {i}', slug=f'{prefix}-group-{i}',
+                  description=self.text(5, 20))
+            for i in range(options['groups'])
+        ))
+        group_ids = list(Group.objects.filter(
+            slug__startswith=f'{prefix}-group-'
+        ).order_by('pk').values_list('pk', flat=True))
+
+        authors = power_law_weights(len(user_ids), options['alpha'])
+        seconds = options['days'] * 24 * 3600
+        self.create(Post, (
+            Post(
+                text=self.text(5, 60),
+                author_id=rng.choices(user_ids, cum_weights=authors)[0],
+                group_id=(
+                    rng.choice(group_ids)
+                    if group_ids and rng.random() < 0.5 else None
+                ),
+                pub_date=now - dt.timedelta(seconds=rng.uniform(0, seconds))
+            )
+            for _ in range(options['posts'])
+        ))
+        posts = list(Post.objects.filter(
+            author_id__in=user_ids
+        ).order_by('pk').values_list('pk', 'pub_date'))
+        # ORDER BY RANDOM() не зависит от --seed, перемешиваем сами
+        rng.shuffle(posts)
+
+        if posts:
+            popular = power_law_weights(len(posts), options['alpha'])
+            self.create(Comment, (
+                Comment(
+                    post_id=post_id,
+                    author_id=rng.choice(user_ids),
+                    text=self.text(2, 20),
+                    created=min(
+                        now,
+                        pub_date + dt.timedelta(seconds=rng.uniform(0, 86400))
+                    )
+                )
+                for post_id, pub_date in (
+                    rng.choices(posts, cum_weights=popular)[0]
+                    for _ in range(options['comments'])
+                )
+            ))
+
+        pairs = set()
+        # Попыток с запасом: на плотном графе часть пар выпадет повторно
+        for _ in range(options['follows'] * 10):
+            if len(pairs) >= options['follows'] or len(user_ids) < 2:
+                break
+            user_id = rng.choice(user_ids)
+            author_id = rng.choices(user_ids, cum_weights=authors)[0]
+            if user_id != author_id:
+                pairs.add((user_id, author_id))
+        self.create(Follow, (
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in sorted(pairs)
+        ))
+
+        rebuild_after_bulk_load(
+            User.objects.filter(username__startswith=prefix).values_list(
+                'username', flat=True
+            ),
+            Group.objects.filter(
+                slug__startswith=f'{prefix}-group-'
+            ).values_list('slug', flat=True)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(user_ids)}, '
+            f'постов: {len(posts)}, подписок: {len(pairs)} '
+            f'за {time.perf_counter() - started:.1f} с'
+        ))
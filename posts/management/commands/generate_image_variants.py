@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.cache import bump_feed_version
+from posts.variants import VARIANTS_DIR, render_variants
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+
+class Command(BaseCommand):
+    help = 'Создаёт WebP/JPEG-варианты для всех картинок в media/posts/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Число процессов'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать и уже готовые варианты'
+        )
+
+    def find_images(self):
+        root = os.path.join(settings.MEDIA_ROOT, 'posts')
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = [name for name in subdirs if name != VARIANTS_DIR]
+            for filename in files:
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(directory, filename)
+                    yield os.path.relpath(path, settings.MEDIA_ROOT)
+
+    def handle(self, *args, **options):
+        images = sorted(self.find_images())
+        total = len(images)
+        created = skipped = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {
+                pool.submit(
+                    render_variants,
+                    settings.MEDIA_ROOT,
+                    name,
+                    settings.IMAGE_VARIANT_WIDTHS,
+                    force=options['force']
+                ): name
+                for name in images
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    if future.result():
+                        created += 1
+                    else:
+                        skipped += 1
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{futures[future]}: {error}')
+                if done % 100 == 0 or done == total:
+                    self.stdout.write(f'{done}/{total}')
+        if created:
+            bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: {created}, уже готово: {skipped}, ошибок: {failed}'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from posts.cache import bump_feed_version
+from posts.models import Post
+from posts.thumbnails import cached_thumbnail, generate
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие миниатюры постов'
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).only('image')
+        created = failed = 0
+        for post in posts.iterator():
+            if cached_thumbnail(post.image) is not None:
+                continue
+            try:
+                ok = generate(post.image.name)
+            except Exception as error:
+                ok = False
+                self.stderr.write(f'{post.image.name}: {error}')
+            if ok:
+                created += 1
+            else:
+                failed += 1
+        if created:
+            bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано миниатюр: {created}, ошибок: {failed}'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.search import is_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Восстанавливает триггеры и перестраивает поисковый индекс постов'
+
+    def handle(self, *args, **options):
+        if not is_available():
+            raise CommandError('Полнотекстовый индекс есть только у SQLite')
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен'))
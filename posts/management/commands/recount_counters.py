@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import (recount_comments, recount_group_stats,
+                            recount_user_stats)
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает денормализованные счётчики постов, '
+            'пользователей и групп')
+
+    def handle(self, *args, **options):
+        posts = recount_comments()
+        users = recount_user_stats()
+        groups = recount_group_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено постов: {posts}, пользователей: {users}, '
+            f'групп: {groups}'
+        ))
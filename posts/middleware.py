@@ -0,0 +1,33 @@
+import logging
+
+from .querycount import QueryRecorder, get_budget
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы каждого запроса и сверяет их с QUERY_BUDGETS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder().record() as recorder:
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        # view_name с пространством имён: 'index', 'api:index'
+        url_name = match.view_name if match else None
+        response.query_count = recorder.count
+        response.query_duration = recorder.duration
+        response.query_duplicates = recorder.duplicates
+        logger.debug(
+            '%s: %d queries, %.1f ms',
+            url_name, recorder.count, recorder.duration * 1000
+        )
+        budget = get_budget(url_name)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                '%s exceeded query budget: %d > %d, duplicates: %s',
+                url_name, recorder.count, budget, recorder.duplicates
+            )
+        return response
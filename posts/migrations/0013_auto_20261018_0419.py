@@ -0,0 +1,51 @@
+# Generated by Django 2.2.6 on 2026-10-18 04:19
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupStats.objects.bulk_create(
+        GroupStats(group_id=group_id)
+        for group_id in Group.objects.values_list('pk', flat=True)
+    )
+    counts = Post.objects.filter(group=OuterRef('pk')).order_by().values(
+        'group'
+    ).annotate(count=Count('pk')).values('count')
+    latest = Post.objects.filter(group=OuterRef('pk')).order_by(
+        '-pub_date', '-pk'
+    )
+    GroupStats.objects.update(
+        posts_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0),
+        last_post=Subquery(latest.values('pk')[:1]),
+        last_activity=Subquery(latest.values('pub_date')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_auto_20261018_0416'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество записей')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя запись')),
+                ('last_post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Post')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['-last_activity'], name='posts_group_last_ac_f9d577_idx'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
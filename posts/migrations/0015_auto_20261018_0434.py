@@ -0,0 +1,57 @@
+# Generated by Django 2.2.6 on 2026-10-18 04:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def clear_feed(apps, schema_editor):
+    apps.get_model('posts', 'FeedEntry').objects.all().delete()
+
+
+def fill_feed(apps, schema_editor):
+    # ленты раскладываются заново целиком, без прежнего FEED_BACKFILL
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry = apps.get_model('posts', 'FeedEntry')
+    follows = Follow.objects.exclude(
+        author__stats__followers_count__gt=settings.FEED_FANOUT_LIMIT
+    )
+    for follow in follows.iterator():
+        posts = Post.objects.filter(
+            author_id=follow.author_id
+        ).values_list('pk', 'pub_date')
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=follow.user_id,
+                    post_id=post_id,
+                    author_id=follow.author_id,
+                    pub_date=pub_date
+                )
+                for post_id, pub_date in posts.iterator()
+            ),
+            batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_auto_20261018_0421'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_feed, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='feedentry',
+            name='pub_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['user', '-pub_date', '-post'], name='posts_feede_user_id_cbce2a_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
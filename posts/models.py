@@ -24,6 +24,22 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Всё, что нужно карточке поста, за один запрос на страницу.
+
+        Число комментариев хранится в ``comments_count``, поэтому
+        аннотация с JOIN и GROUP BY не нужна.
+        """
+        return self.select_related('author', 'group').defer(
+            'group__description',
+            'author__password',
+            'author__email',
+            'author__last_login',
+            'author__date_joined',
+        )
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текс нового поста',
@@ -50,9 +66,35 @@ class Post(models.Model):
         help_text='Выберите группу для поста'
     )
     image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина картинки',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота картинки',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        # ленты сортируются по дате внутри автора/группы, без временной
+        # сортировки (см. manage.py audit_queries)
+        indexes = [
+            models.Index(fields=['-pub_date']),
+            models.Index(fields=['author', '-pub_date']),
+            models.Index(fields=['group', '-pub_date']),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -84,6 +126,8 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created']
+        # порции комментариев идут по курсору (created, id)
+        indexes = [models.Index(fields=['post', '-created', '-id'])]
 
     def __str__(self):
         return self.text[:10]
@@ -105,6 +149,240 @@ class Follow(models.Model):
         constraints = [models.UniqueConstraint(
             fields=['user', 'author'],
             name='unique follow')]
+        # подписчики автора; подписки пользователя покрывает уникальный индекс
+        indexes = [models.Index(fields=['author', 'user'])]
 
     def __str__(self):
         return f'{self.author.username}:{self.user.username}'
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Количество записей',
+        default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Количество подписчиков',
+        default=0
+    )
+    following_count = models.PositiveIntegerField(
+        verbose_name='Количество подписок',
+        default=0
+    )
+
+    def __str__(self):
+        return f'{self.user.username}: {self.posts_count}'
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Количество записей',
+        default=0
+    )
+    last_post = models.ForeignKey(
+        Post,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+',
+    )
+    last_activity = models.DateTimeField(
+        verbose_name='Последняя запись',
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=['-last_activity'])]
+
+    def __str__(self):
+        return f'{self.group_id}: {self.posts_count}'
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    # копия post.pub_date: страница ленты — диапазон по индексу
+    # (user, -pub_date, -post) в порядке курсора, без сортировки
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'post'],
+            name='unique feed entry')]
+        indexes = [
+            models.Index(fields=['user', 'author']),
+            models.Index(fields=['user', '-pub_date', '-post']),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.post_id}'
+
+
+class Recommendation(models.Model):
+    """Кого подписаться: строится командой build_recommendations."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+    )
+    candidate = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    # сколько авторов из подписок пользователя подписаны на кандидата
+    mutual = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'candidate'],
+            name='unique recommendation')]
+        indexes = [models.Index(fields=['user', 'rank'])]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.candidate_id}'
+
+
+class TrendingEpoch(models.Model):
+    """Точка отсчёта оценок популярности, одна строка (posts.trending)."""
+    epoch = models.DateTimeField()
+
+    def __str__(self):
+        return self.epoch.isoformat()
+
+
+class PostTrend(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trend',
+    )
+    # копия post.group_id, чтобы топ группы читался по одному индексу
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+',
+    )
+    score = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score']),
+            models.Index(fields=['group', '-score']),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score}'
+
+
+class GroupTrend(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trend',
+    )
+    score = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['-score'])]
+
+    def __str__(self):
+        return f'{self.group_id}: {self.score}'
+
+
+class ArchivedPost(models.Model):
+    """Пост старше ARCHIVE_AFTER_DAYS, перенесённый командой archive_posts.
+
+    Повторяет поля Post вместе с id, поэтому адреса постов не меняются,
+    а шаблоны показывают архивный пост как обычный.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    pub_date = models.DateTimeField('date published')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='archived_posts',
+    )
+    image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(blank=True, null=True)
+    image_height = models.PositiveIntegerField(blank=True, null=True)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
+
+    # архив только читается: без формы комментария и редактирования
+    is_archived = True
+
+    class Meta:
+        ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['-pub_date']),
+            models.Index(fields=['author', '-pub_date']),
+            models.Index(fields=['group', '-pub_date']),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    text = models.TextField()
+    created = models.DateTimeField('date created')
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [models.Index(fields=['post', '-created', '-id'])]
+
+    def __str__(self):
+        return self.text[:10]
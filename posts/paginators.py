@@ -0,0 +1,196 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+from yatube.settings import PAGINATOR
+
+from .archive import HotThenArchive
+
+
+def encode_cursor(values):
+    # isoformat() сохраняет микросекунды, без них ключ неоднозначен
+    values = [
+        value.isoformat() if hasattr(value, 'isoformat') else value
+        for value in values
+    ]
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    """Сырые значения ключа из курсора или None, если курсор испорчен."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw.decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+
+class CursorPage(Sequence):
+    """Страница курсорного паджинатора.
+
+    Повторяет интерфейс ``django.core.paginator.Page``, которым пользуются
+    шаблоны, но вместо номеров страниц отдаёт непрозрачные курсоры.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None, params=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.params = params
+
+    def __repr__(self):
+        return f'<CursorPage: {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _querystring(self, name, cursor):
+        params = self.params.copy() if self.params is not None else {}
+        for key in ('page', 'after', 'before'):
+            params.pop(key, None)
+        params[name] = cursor
+        if hasattr(params, 'urlencode'):
+            return params.urlencode()
+        return f'{name}={cursor}'
+
+    @property
+    def next_querystring(self):
+        return self._querystring('after', self.next_cursor)
+
+    @property
+    def previous_querystring(self):
+        return self._querystring('before', self.previous_cursor)
+
+
+class CursorPaginator:
+    """Keyset-паджинатор: ищет по ``(pub_date, id)`` вместо OFFSET.
+
+    Стоимость запроса не зависит от глубины прокрутки: каждая страница —
+    это один индексный поиск с LIMIT и без COUNT(*). ``archive`` —
+    выборка тех же полей со строками старше всех в ``object_list``,
+    она читается, когда основной не хватило на страницу.
+    """
+
+    def __init__(self, object_list, per_page, fields=('pub_date', 'id'),
+                 archive=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.fields = tuple(fields)
+        self.sources = [object_list]
+        if archive is not None:
+            self.sources.append(archive)
+
+    def encode_cursor(self, obj):
+        # строки .values() — словари, а не объекты модели
+        if isinstance(obj, dict):
+            return encode_cursor([obj[field] for field in self.fields])
+        return encode_cursor([getattr(obj, field) for field in self.fields])
+
+    def decode_cursor(self, cursor):
+        """Возвращает значения ключа или None для испорченного курсора."""
+        values = decode_cursor(cursor, len(self.fields))
+        if values is None:
+            return None
+        model_meta = self.object_list.model._meta
+        try:
+            return [
+                model_meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            return None
+
+    def _seek(self, values, lookup):
+        """Строит условие «строго после ключа» для составного ключа."""
+        condition = Q()
+        for position, field in enumerate(self.fields):
+            step = Q(**{f'{field}__{lookup}': values[position]})
+            for prev_field, prev_value in zip(
+                    self.fields[:position], values[:position]):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition
+
+    def _fetch(self, sources, ordering, condition):
+        """per_page + 1 строк: из первой выборки, остаток из следующих."""
+        rows = []
+        for queryset in sources:
+            queryset = queryset.order_by(*ordering)
+            if condition is not None:
+                queryset = queryset.filter(condition)
+            rows += queryset[:self.per_page + 1 - len(rows)]
+            if len(rows) > self.per_page:
+                break
+        return rows
+
+    def get_page(self, after=None, before=None, params=None):
+        descending = [f'-{field}' for field in self.fields]
+        after_values = self.decode_cursor(after)
+        before_values = self.decode_cursor(before)
+
+        if before_values is not None:
+            # назад, к новым строкам: архив раньше основной выборки
+            rows = self._fetch(
+                self.sources[::-1], self.fields,
+                self._seek(before_values, 'gt')
+            )
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_previous, has_next = has_more, True
+        else:
+            condition = None
+            if after_values is not None:
+                condition = self._seek(after_values, 'lt')
+            rows = self._fetch(self.sources, descending, condition)
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = after_values is not None
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1])
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0])
+        return CursorPage(rows, self, next_cursor, previous_cursor, params)
+
+
+def paginate(request, object_list, per_page=PAGINATOR, archive=None):
+    """Отдаёт страницу ленты: по номеру или, если включено, по курсору.
+
+    Строки ``archive`` (см. posts.archive) идут после ``object_list``.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if settings.CURSOR_PAGINATION or after or before:
+        paginator = CursorPaginator(object_list, per_page, archive=archive)
+        return paginator.get_page(after, before, request.GET)
+    if archive is not None:
+        object_list = HotThenArchive(object_list, archive)
+    paginator = Paginator(object_list, per_page)
+    return paginator.get_page(request.GET.get('page'))
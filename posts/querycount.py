@@ -0,0 +1,74 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+NUMBERS = re.compile(r'\b\d+\b')
+
+
+def fingerprint(sql):
+    """Шаблон запроса без конкретных значений — для поиска N+1."""
+    return NUMBERS.sub('?', sql)
+
+
+class QueryRecorder:
+    """Обёртка ``execute_wrapper``: считает запросы и время в БД."""
+
+    def __init__(self, capture=False):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        # при capture=True сохраняются сами запросы с параметрами
+        self.queries = [] if capture else None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+            if self.queries is not None:
+                self.queries.append((sql, params))
+
+    @property
+    def duplicates(self):
+        return {
+            sql: count
+            for sql, count in self.fingerprints.items() if count > 1
+        }
+
+    @contextmanager
+    def record(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+def get_budget(url_name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(url_name)
+
+
+@contextmanager
+def assert_query_budget(url_name, budget=None):
+    """Тестовый помощник: падает, если блок превысил бюджет запросов.
+
+        with assert_query_budget('index'):
+            self.client.get(reverse('index'))
+    """
+    budget = budget if budget is not None else get_budget(url_name)
+    with QueryRecorder().record() as recorder:
+        yield recorder
+    if budget is not None and recorder.count > budget:
+        duplicates = '\n'.join(
+            f'{count} x {sql}' for sql, count in recorder.duplicates.items()
+        )
+        raise AssertionError(
+            f'{url_name}: {recorder.count} запросов при бюджете {budget}'
+            f'\n{duplicates}'
+        )
@@ -0,0 +1,90 @@
+"""Ограничение частоты записей: token bucket в кэше.
+
+Ведро на пару (view, пользователь) и на пару (view, IP). Ёмкость и
+скорость пополнения задаются строкой вида ``'20/m'`` в RATELIMITS.
+Состояние ведра — (токены, время) под одним ключом кэша, поэтому
+проверка стоит один get_many и один set_many. Между процессами
+чтение и запись не атомарны: при гонке лимит может быть превышен
+на несколько запросов, для защиты от скриптов этого достаточно.
+"""
+import logging
+import math
+import time
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'20/m' -> (20, 60): ёмкость ведра и время полного пополнения."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def take_tokens(buckets, now=None):
+    """Берёт по токену из каждого ведра {ключ: rate}.
+
+    Возвращает 0, если запрос разрешён, иначе сколько секунд ждать.
+    Если хоть одно ведро пустое, токены не списываются ни из одного.
+    """
+    now = time.time() if now is None else now
+    state = cache.get_many(list(buckets))
+    updated, retry_after = {}, 0
+    for key, rate in buckets.items():
+        capacity, period = parse_rate(rate)
+        tokens, stamp = state.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - stamp) * capacity / period)
+        if tokens < 1:
+            retry_after = max(retry_after, (1 - tokens) * period / capacity)
+        updated[key] = (tokens - 1, now)
+    if retry_after:
+        return retry_after
+    # ведро, не тронутое за период, снова полное: ключ можно забыть
+    cache.set_many(updated, max(parse_rate(r)[1] for r in buckets.values()))
+    return 0
+
+
+def ratelimit(name, methods=None):
+    """Декоратор view: лимиты из ``settings.RATELIMITS[name]``.
+
+        RATELIMITS = {'add_comment': {'user': '20/m', 'ip': '60/m'}}
+
+    ``methods`` ограничивает проверку, например только POST.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limits = settings.RATELIMITS.get(name)
+            if (not settings.RATELIMIT_ENABLED or not limits
+                    or (methods and request.method not in methods)):
+                return view(request, *args, **kwargs)
+            buckets = {}
+            if 'user' in limits and request.user.is_authenticated:
+                buckets[f'rl:{name}:u{request.user.pk}'] = limits['user']
+            if 'ip' in limits:
+                buckets[f'rl:{name}:ip{client_ip(request)}'] = limits['ip']
+            retry_after = take_tokens(buckets) if buckets else 0
+            if retry_after:
+                logger.warning(
+                    '%s rate limited: %s', name, ', '.join(buckets)
+                )
+                response = HttpResponse(
+                    'Слишком много запросов, попробуйте позже',
+                    status=429
+                )
+                response['Retry-After'] = str(math.ceil(retry_after))
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,134 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from .paginators import (CursorPage, CursorPaginator, decode_cursor,
+                         encode_cursor)
+
+FTS_TABLE = 'posts_post_fts'
+WORD = re.compile(r'\w+')
+
+MATCHES_SQL = (
+    f'SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+)
+# rank у FTS5 — это bm25 со знаком минус: чем меньше, тем релевантнее
+AFTER_SQL = (
+    f'SELECT rowid, rank FROM ({MATCHES_SQL}) '
+    'WHERE rank > %s OR (rank = %s AND rowid > %s) '
+    'ORDER BY rank, rowid LIMIT %s'
+)
+BEFORE_SQL = (
+    f'SELECT rowid, rank FROM ({MATCHES_SQL}) '
+    'WHERE rank < %s OR (rank = %s AND rowid < %s) '
+    'ORDER BY rank DESC, rowid DESC LIMIT %s'
+)
+FIRST_SQL = f'{MATCHES_SQL} ORDER BY rank, rowid LIMIT %s'
+
+# Триггеры пропадают, если миграция пересоздаёт таблицу posts_post,
+# поэтому rebuild_index() ставит их заново
+INDEX_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 0')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+    "AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    "END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+    "AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    "AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    "END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def rebuild_index():
+    with connection.cursor() as cursor:
+        for statement in INDEX_SQL:
+            cursor.execute(statement)
+
+
+def match_expression(query):
+    """Запрос пользователя в безопасное выражение FTS5: слова по префиксу."""
+    return ' '.join(f'"{word}"*' for word in WORD.findall(query))
+
+
+def matching_posts(query):
+    """Условие ``pk__in`` по полнотекстовому индексу, для админки."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match_expression(query),)
+    )
+
+
+class SearchPaginator:
+    """Keyset-паджинация по ``(rank, id)`` результатов FTS5."""
+
+    def __init__(self, query, per_page):
+        self.match = match_expression(query)
+        self.per_page = int(per_page)
+
+    def _fetch(self, after, before):
+        limit = self.per_page + 1
+        if before is not None:
+            rank, post_id = before
+            sql, params = BEFORE_SQL, (self.match, rank, rank, post_id, limit)
+        elif after is not None:
+            rank, post_id = after
+            sql, params = AFTER_SQL, (self.match, rank, rank, post_id, limit)
+        else:
+            sql, params = FIRST_SQL, (self.match, limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def get_page(self, after=None, before=None, params=None):
+        after = decode_cursor(after, 2)
+        before = decode_cursor(before, 2)
+        if not self.match:
+            return CursorPage([], self, params=params)
+        rows = self._fetch(after, before)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if before is not None:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, after is not None
+
+        posts = Post.objects.for_feed().in_bulk([row[0] for row in rows])
+        object_list = [posts[pk] for pk, rank in rows if pk in posts]
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(rows[-1][::-1])
+        if rows and has_previous:
+            previous_cursor = encode_cursor(rows[0][::-1])
+        return CursorPage(
+            object_list, self, next_cursor, previous_cursor, params
+        )
+
+
+def search_page(request, query, per_page):
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if is_available():
+        paginator = SearchPaginator(query, per_page)
+    else:
+        paginator = CursorPaginator(
+            Post.objects.for_feed().filter(text__icontains=query),
+            per_page
+        )
+    return paginator.get_page(after, before, request.GET)
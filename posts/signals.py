@@ -0,0 +1,165 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import feed, following, live, thumbnails, trending
+from .cache import bump_feed_version, bump_scope_versions
+from .counters import (add_group_post, change_comments_count,
+                       change_user_stats, refresh_group_stats)
+from .feeds import author_scope, group_scope, groups_scope, site_scope
+from .models import Comment, Follow, Group, GroupStats, Post, UserStats
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        change_comments_count(instance.post_id, 1)
+        trending.comment_created(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_comments_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        change_user_stats(instance.author_id, posts_count=1)
+        feed.fan_out(instance)
+        trending.post_created(instance)
+        if instance.group_id is not None:
+            add_group_post(instance)
+    elif getattr(instance, '_previous_group_id', None) != instance.group_id:
+        trending.post_moved(instance.pk, instance.group_id)
+        for group_id in (instance._previous_group_id, instance.group_id):
+            if group_id is not None:
+                refresh_group_stats(group_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_user_stats(instance.author_id, posts_count=-1)
+    if instance.group_id is not None:
+        refresh_group_stats(instance.group_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        user_id, author_id = instance.user_id, instance.author_id
+        transaction.on_commit(
+            lambda: following.add_followed(user_id, author_id)
+        )
+        change_user_stats(instance.author_id, followers_count=1)
+        change_user_stats(instance.user_id, following_count=1)
+        feed.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    user_id, author_id = instance.user_id, instance.author_id
+    transaction.on_commit(
+        lambda: following.remove_followed(user_id, author_id)
+    )
+    change_user_stats(instance.author_id, followers_count=-1)
+    change_user_stats(instance.user_id, following_count=-1)
+    feed.prune(instance.user_id, instance.author_id)
+    if UserStats.objects.filter(
+        user_id=instance.author_id,
+        followers_count=settings.FEED_FANOUT_LIMIT
+    ).exists():
+        feed.backfill_followers(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_feeds(sender, **kwargs):
+    bump_feed_version()
+
+
+@receiver(post_save, sender=Post)
+def notify_live(sender, instance, created, **kwargs):
+    if created:
+        post_id = instance.pk
+        transaction.on_commit(lambda: live.hub.publish(post_id))
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # при переносе поста в другую группу меняются обе ленты групп
+    instance._previous_group_id = Post.objects.filter(
+        pk=instance.pk
+    ).values_list('group_id', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_syndication(sender, instance, **kwargs):
+    group_ids = {
+        instance.group_id,
+        getattr(instance, '_previous_group_id', None),
+    } - {None}
+    slugs = []
+    # форма уже загрузила группу и автора: запрос нужен только для
+    # прежней группы перенесённого поста или незагруженных связей
+    if instance.group_id in group_ids and Post.group.is_cached(instance):
+        slugs.append(instance.group.slug)
+        group_ids.discard(instance.group_id)
+    if group_ids:
+        slugs += Group.objects.filter(pk__in=group_ids).values_list(
+            'slug', flat=True
+        )
+    if Post.author.is_cached(instance):
+        username = instance.author.username
+    else:
+        username = User.objects.filter(pk=instance.author_id).values_list(
+            'username', flat=True
+        ).first()
+    bump_scope_versions(
+        site_scope(),
+        author_scope(username),
+        *(group_scope(slug) for slug in slugs),
+        *([groups_scope()] if slugs else [])
+    )
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+    bump_scope_versions(groups_scope(), group_scope(instance.slug))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump_scope_versions(groups_scope())
+
+
+@receiver(post_save, sender=Post)
+def queue_thumbnail(sender, instance, **kwargs):
+    if instance.image:
+        name = instance.image.name
+        transaction.on_commit(lambda: thumbnails.enqueue(name))
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    # счётчики дальше только сдвигаются UPDATE-ом, без пересчёта
+    if created and not raw:
+        UserStats.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def forget_following(sender, instance, created, **kwargs):
+    # после очистки базы id может достаться новому пользователю
+    if created:
+        following.forget(instance.pk)
@@ -0,0 +1,59 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def is_locked(error):
+    return 'database is locked' in str(error)
+
+
+@contextmanager
+def write_transaction():
+    """atomic(), который на SQLite сразу берёт блокировку на запись."""
+    immediate = getattr(connection, 'immediate_transactions', None)
+    if immediate is None or connection.in_atomic_block:
+        with transaction.atomic():
+            yield
+        return
+    connection.immediate_transactions = True
+    try:
+        with transaction.atomic():
+            yield
+    finally:
+        connection.immediate_transactions = immediate
+
+
+def retry_on_locked(func):
+    """Повторяет запись, упавшую на блокировке SQLite, с экспоненциальной
+    задержкой. Каждая попытка идёт в своей транзакции, поэтому сигналы
+    со счётчиками и лентами откатываются вместе с ней.
+
+    Транзакция сразу берёт блокировку на запись, поэтому оборачивать
+    нужно только саму запись, а не view с проверкой формы и рендером.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        attempts = settings.SQLITE_WRITE_RETRIES
+        for attempt in range(attempts + 1):
+            try:
+                with write_transaction():
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                # во внешней транзакции повтор ничего не даст
+                if (not is_locked(error) or attempt == attempts
+                        or connection.in_atomic_block):
+                    raise
+                delay = settings.SQLITE_RETRY_DELAY * 2 ** attempt
+                logger.warning(
+                    '%s: database is locked, retry %d in %.3f s',
+                    func.__name__, attempt + 1, delay
+                )
+                time.sleep(delay * random.uniform(0.5, 1.5))
+    return wrapper
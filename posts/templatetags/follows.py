@@ -0,0 +1,13 @@
+from django import template
+
+from posts.following import is_following
+
+register = template.Library()
+
+
+@register.filter
+def followed_by(author, user):
+    """{% if author|followed_by:request.user %} — из кэша подписок."""
+    if not user.is_authenticated:
+        return False
+    return is_following(user.pk, author.pk)
@@ -0,0 +1,30 @@
+from django import template
+
+from posts.thumbnails import cached_thumbnail, enqueue
+from posts.variants import srcsets
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_picture(image):
+    """<picture> с WebP/JPEG нужной ширины через srcset.
+
+    Пока варианты не готовы, выводится миниатюра или заглушка. В очередь
+    картинка ставится, только если нет ни того, ни другого: миниатюра и
+    варианты создаются одной задачей. Старые картинки без вариантов
+    дорабатывает команда generate_image_variants.
+    """
+    if not image:
+        return {}
+    variants = srcsets(image)
+    if variants is not None:
+        return {'image': image, 'srcsets': variants}
+    thumbnail = cached_thumbnail(image)
+    if thumbnail is None:
+        enqueue(image.name)
+        # при THUMBNAIL_WORKERS = 0 всё уже готово
+        variants = srcsets(image)
+        if variants is not None:
+            return {'image': image, 'srcsets': variants}
+    return {'image': image, 'thumbnail': thumbnail}
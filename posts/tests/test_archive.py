@@ -0,0 +1,197 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import (ArchivedComment, ArchivedPost, Comment, FeedEntry,
+                          Follow, Group, GroupStats, Post, UserStats)
+from posts.querycount import assert_query_budget
+
+
+@override_settings(ARCHIVE_AFTER_DAYS=30)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-group', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        Follow.objects.create(user=self.reader, author=self.author)
+        now = timezone.now()
+        self.old = []
+        for number in range(4):
+            post = Post.objects.create(
+                text=f'Старый пост {number}', author=self.author,
+                group=self.group
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(days=60 + number)
+            )
+            self.old.append(post)
+        Comment.objects.create(
+            post=self.old[0], author=self.reader, text='Старый комментарий'
+        )
+        self.hot = [
+            Post.objects.create(
+                text=f'Новый пост {number}', author=self.author,
+                group=self.group
+            )
+            for number in range(8)
+        ]
+
+    def archive(self):
+        call_command('archive_posts', stdout=StringIO())
+
+    def test_moves_old_posts(self):
+        '''Старые посты и их комментарии уходят в архив с теми же id'''
+        self.archive()
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            {post.pk for post in self.old}
+        )
+        self.assertEqual(Post.objects.count(), len(self.hot))
+        self.assertFalse(Comment.objects.exists())
+        comment = ArchivedComment.objects.get()
+        self.assertEqual(comment.post_id, self.old[0].pk)
+        self.assertEqual(ArchivedPost.objects.get(
+            pk=self.old[0].pk
+        ).comments_count, 1)
+        self.assertFalse(FeedEntry.objects.filter(
+            post_id__in=[post.pk for post in self.old]
+        ).exists())
+
+    def test_counters_keep_archive(self):
+        '''Архивные посты остаются в счётчиках автора и группы'''
+        self.archive()
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(UserStats.objects.get(user=self.author).posts_count,
+                         12)
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 12)
+        self.assertEqual(stats.last_post, self.hot[-1])
+
+    def page_texts(self, url, **params):
+        response = self.client.get(url, params)
+        return [post.text for post in response.context['page']]
+
+    def test_feeds_fall_back(self):
+        '''Ленты продолжаются архивом после горячих постов'''
+        self.archive()
+        expected = [
+            *(f'Новый пост {number}' for number in range(7, -1, -1)),
+            *(f'Старый пост {number}' for number in range(4)),
+        ]
+        for url in (reverse('index'), reverse('group', args=['test-group']),
+                    reverse('profile', args=['author']),
+                    reverse('follow_index')):
+            with self.subTest(url=url):
+                first = self.page_texts(url)
+                second = self.page_texts(url, page=2)
+                self.assertEqual(first + second, expected)
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_cursor_crosses_archive(self):
+        '''Курсор проходит границу горячих постов в обе стороны'''
+        self.archive()
+        url = reverse('index')
+        first = self.client.get(url).context['page']
+        second = self.client.get(
+            url, {'after': first.next_cursor}
+        ).context['page']
+        # на первой странице 10 постов: 8 горячих и 2 из архива
+        self.assertEqual(
+            [post.pk for post in first][-2:],
+            [self.old[0].pk, self.old[1].pk]
+        )
+        self.assertEqual(
+            [post.pk for post in second], [self.old[2].pk, self.old[3].pk]
+        )
+        self.assertFalse(second.has_next())
+        back = self.client.get(
+            url, {'before': second.previous_cursor}
+        ).context['page']
+        self.assertEqual(list(back), list(first))
+
+    def test_archived_post_page(self):
+        '''Архивный пост открывается по старому адресу, только для чтения'''
+        self.archive()
+        post = self.old[0]
+        response = self.client.get(
+            reverse('post', args=['author', post.pk])
+        )
+        self.assertContains(response, 'Старый пост 0')
+        self.assertContains(response, 'Старый комментарий')
+        self.assertIsNone(response.context['form'])
+        response = self.client.post(
+            reverse('add_comment', args=['author', post.pk]),
+            {'text': 'Текст'}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse('post_comments', args=['author', post.pk]),
+            {'format': 'json'}
+        )
+        self.assertEqual(
+            [comment['text'] for comment in response.json()['comments']],
+            ['Старый комментарий']
+        )
+
+    def test_api_falls_back(self):
+        '''API продолжает ленты архивом и отдаёт архивные посты'''
+        self.archive()
+        expected = [
+            *(f'Новый пост {number}' for number in range(7, -1, -1)),
+            *(f'Старый пост {number}' for number in range(4)),
+        ]
+        for url in (reverse('api:index'),
+                    reverse('api:group', args=['test-group']),
+                    reverse('api:profile', args=['author']),
+                    reverse('api:follow_index')):
+            with self.subTest(url=url):
+                first = self.client.get(url).json()
+                second = self.client.get(url, {'after': first['next']}).json()
+                self.assertEqual(
+                    [post['text'] for post in first['results']]
+                    + [post['text'] for post in second['results']],
+                    expected
+                )
+        post = self.old[0]
+        data = self.client.get(reverse('api:post', args=[post.pk])).json()
+        self.assertEqual(data['post']['text'], 'Старый пост 0')
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']['results']],
+            ['Старый комментарий']
+        )
+        for url_name in ('api:post_comments', 'post_comments'):
+            args = [post.pk] if url_name.startswith('api:') else [
+                'author', post.pk
+            ]
+            with self.subTest(url_name=url_name):
+                cache.clear()
+                with assert_query_budget(url_name):
+                    response = self.client.get(reverse(url_name, args=args))
+                self.assertContains(response, 'Старый комментарий')
+
+    def test_syndication_refreshed(self):
+        '''RSS сайта, группы и автора перестают показывать архивные посты'''
+        urls = (reverse('feed_rss'), reverse('group_rss', args=['test-group']),
+                reverse('profile_rss', args=['author']))
+        for url in urls:
+            self.assertContains(self.client.get(url), 'Старый пост 0')
+        self.archive()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotContains(self.client.get(url), 'Старый пост 0')
@@ -0,0 +1,48 @@
+import json
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.management.commands.audit_queries import plan_problems
+from posts.models import Comment
+
+
+class QueryAuditTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command(
+            'generate_dataset', users=10, groups=2, posts=50,
+            comments=50, follows=20, stdout=StringIO()
+        )
+
+    def test_feeds_use_indexes(self):
+        '''Ленты и страница поста читаются по индексам, без сортировок'''
+        out = StringIO()
+        call_command('audit_queries', stdout=out)
+        report = json.loads(out.getvalue())
+        for name in ('index', 'group', 'profile', 'post', 'follow_index',
+                     'profile_follow', 'groups', 'trending',
+                     'group_trending'):
+            with self.subTest(view=name):
+                self.assertEqual(report[name], [])
+
+    def test_audit_rolls_back(self):
+        '''Аудит не оставляет записей в базе'''
+        comments = Comment.objects.count()
+        call_command('audit_queries', stdout=StringIO())
+        self.assertEqual(Comment.objects.count(), comments)
+
+    def test_plan_problems(self):
+        '''Полный скан и временная сортировка помечаются'''
+        plan = [
+            'SCAN posts_post',
+            'SEARCH auth_user USING INTEGER PRIMARY KEY (rowid=?)',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ]
+        self.assertEqual(plan_problems(plan), [plan[0], plan[2]])
+        self.assertEqual(
+            plan_problems(['SCAN posts_post USING INDEX posts_post_idx']),
+            []
+        )
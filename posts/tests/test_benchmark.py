@@ -0,0 +1,91 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from posts.cache import scope_version
+from posts.feeds import author_scope, group_scope, groups_scope, site_scope
+from posts.management.commands.benchmark import percentile
+from posts.models import Comment, FeedEntry, Follow, Post, UserStats
+
+
+class DatasetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_generate_dataset(self):
+        '''Генератор создаёт связанные данные и пересчитывает счётчики'''
+        call_command(
+            'generate_dataset', users=20, groups=3, posts=200,
+            comments=300, follows=50, stdout=StringIO()
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertEqual(Follow.objects.count(), 50)
+        self.assertTrue(FeedEntry.objects.exists())
+        top = UserStats.objects.order_by('-posts_count').first()
+        self.assertEqual(top.posts_count, top.user.posts.count())
+        # Степенной закон: у самого активного автора заметная доля постов
+        self.assertGreater(top.posts_count, 200 / 20)
+
+    def test_seed_reproducible(self):
+        '''С одним --seed комментарии ложатся на те же посты'''
+        def comment_counts(prefix):
+            call_command(
+                'generate_dataset', users=10, groups=2, posts=40,
+                comments=80, follows=10, prefix=prefix, seed=7,
+                stdout=StringIO()
+            )
+            return [
+                post.comments.count() for post in Post.objects.filter(
+                    author__username__startswith=prefix
+                ).order_by('pk')
+            ]
+
+        self.assertEqual(comment_counts('first'), comment_counts('second'))
+
+    def test_benchmark_report(self):
+        '''Замер возвращает перцентили, RPS и запросы для каждой страницы'''
+        call_command(
+            'generate_dataset', users=5, groups=1, posts=30,
+            comments=30, follows=8, stdout=StringIO()
+        )
+        out = StringIO()
+        call_command('benchmark', requests=3, warmup=1, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['views']), {
+            'index', 'group', 'profile', 'post', 'follow_index',
+            'add_comment', 'new_post',
+        })
+        for result in report['views'].values():
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            self.assertGreater(result['queries_per_request'], 0)
+
+    def test_percentile(self):
+        '''Перцентиль считается по ближайшему рангу'''
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertIsNone(percentile([], 0.5))
+
+
+class DatasetScopesTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_syndication_refreshed(self):
+        '''Генератор сдвигает версии RSS/Atom своих групп и авторов'''
+        scopes = (site_scope(), groups_scope(), group_scope('bench-group-0'),
+                  author_scope('bench0'))
+        versions = [scope_version(scope) for scope in scopes]
+        call_command(
+            'generate_dataset', users=3, groups=1, posts=5, comments=5,
+            follows=2, stdout=StringIO()
+        )
+        for scope, version in zip(scopes, versions):
+            with self.subTest(scope=scope):
+                self.assertGreater(scope_version(scope), version)
@@ -0,0 +1,78 @@
+import datetime as dt
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Post
+from posts.querycount import assert_query_budget
+
+
+class CommentLoadingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=cls.user
+        )
+        now = timezone.now()
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(settings.COMMENT_PER_PAGE * 2 + 1)
+        )
+        # одинаковые даты: порядок держится на id
+        Comment.objects.update(created=now - dt.timedelta(hours=1))
+        cls.comments = list(cls.post.comments.order_by('-created', '-id'))
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def comments_url(self, **params):
+        url = reverse('post_comments', args=[self.user.username, self.post.id])
+        return self.guest_client.get(url, params)
+
+    def test_post_page_shows_first_slice(self):
+        '''Страница поста выводит первую порцию и кнопку «ещё»'''
+        response = self.guest_client.get(
+            reverse('post', args=[self.user.username, self.post.id])
+        )
+        page = response.context['page']
+        self.assertEqual(
+            list(page),
+            self.comments[:settings.COMMENT_PER_PAGE]
+        )
+        self.assertContains(response, 'data-comments-url')
+
+    def test_fragment_continues_by_cursor(self):
+        '''Фрагмент по курсору продолжает список без повторов'''
+        seen = []
+        response = self.comments_url(format='json')
+        while True:
+            data = response.json()
+            seen.extend(item['id'] for item in data['comments'])
+            if data['next'] is None:
+                break
+            response = self.comments_url(format='json', after=data['next'])
+        self.assertEqual(seen, [comment.id for comment in self.comments])
+
+    def test_fragment_is_partial(self):
+        '''Фрагмент не содержит страницу целиком'''
+        response = self.comments_url()
+        self.assertTemplateUsed(response, 'includes/comment_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertNotContains(response, '<html')
+        self.assertContains(response, 'Комментарий')
+
+    def test_fragment_within_budget(self):
+        '''Порция комментариев — это поиск поста и один запрос'''
+        with assert_query_budget('post_comments'):
+            self.comments_url()
@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, UserStats
+from posts.querycount import assert_query_budget
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author',
+            password='12345'
+        )
+        cls.reader = User.objects.create_user(
+            username='reader',
+            password='12345'
+        )
+
+    def setUp(self):
+        # подписки в кэше переживают откат транзакции теста
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=self.author
+        )
+
+    def test_comment_counter(self):
+        '''Счётчик комментариев меняется при добавлении и удалении'''
+        self.reader_client.post(
+            reverse('add_comment', args=[self.author.username, self.post.id]),
+            data={'text': 'Текст тестового коммента'}
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        Comment.objects.get(post=self.post).delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_drifted_comment_counter(self):
+        '''Удаление при разошедшемся нулевом счётчике не ломается'''
+        Comment.objects.create(post=self.post, author=self.reader, text='Т')
+        Post.objects.filter(pk=self.post.pk).update(comments_count=0)
+        self.post.delete()
+        self.assertFalse(Comment.objects.exists())
+
+    def test_user_counters(self):
+        '''Счётчики записей и подписок пользователя'''
+        self.reader_client.get(
+            reverse('profile_follow', args=[self.author.username])
+        )
+        author_stats = UserStats.objects.get(user=self.author)
+        reader_stats = UserStats.objects.get(user=self.reader)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(reader_stats.following_count, 1)
+        self.reader_client.get(
+            reverse('profile_unfollow', args=[self.author.username])
+        )
+        self.post.delete()
+        author_stats.refresh_from_db()
+        reader_stats.refresh_from_db()
+        self.assertEqual(author_stats.posts_count, 0)
+        self.assertEqual(author_stats.followers_count, 0)
+        self.assertEqual(reader_stats.following_count, 0)
+
+    def test_recount_command(self):
+        '''Команда recount_counters исправляет разошедшиеся счётчики'''
+        Comment.objects.create(
+            post=self.post,
+            author=self.reader,
+            text='Текст тестового коммента'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.filter(pk=self.post.pk).update(comments_count=7)
+        UserStats.objects.filter(user=self.author).update(
+            posts_count=0,
+            followers_count=5
+        )
+        call_command('recount_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        author_stats = UserStats.objects.get(user=self.author)
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+
+    def test_profile_shows_counters(self):
+        '''Карточка автора выводит сохранённые счётчики'''
+        response = self.reader_client.get(
+            reverse('profile', args=[self.author.username])
+        )
+        self.assertContains(response, 'Записей: 1')
+
+    def test_stats_created_with_user(self):
+        '''Строка статистики появляется вместе с пользователем'''
+        user = User.objects.create_user(username='newcomer')
+        stats = UserStats.objects.get(user=user)
+        self.assertEqual(
+            (stats.posts_count, stats.followers_count, stats.following_count),
+            (0, 0, 0)
+        )
+
+    def test_first_follow_within_budget(self):
+        '''Первая подписка только сдвигает счётчики, без пересчёта'''
+        newcomer = User.objects.create_user(username='newcomer')
+        client = Client()
+        client.force_login(newcomer)
+        with assert_query_budget('profile_follow'):
+            client.get(reverse('profile_follow', args=[self.author.username]))
+        self.assertEqual(
+            UserStats.objects.get(user=newcomer).following_count, 1
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).followers_count, 1
+        )
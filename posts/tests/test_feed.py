@@ -0,0 +1,129 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.models import FeedEntry, Follow, Post
+
+
+class FollowFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author',
+            password='12345'
+        )
+        cls.reader = User.objects.create_user(
+            username='reader',
+            password='12345'
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        cache.clear()
+
+    def feed(self):
+        response = self.reader_client.get(reverse('follow_index'))
+        return list(response.context['page'])
+
+    def test_new_post_fans_out(self):
+        '''Новый пост раскладывается в ленты подписчиков'''
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.author_client.post(
+            reverse('new_post'),
+            data={'text': 'Текст тестового поста'}
+        )
+        post = Post.objects.get(author=self.author)
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed(), [post])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        '''Подписка дозаполняет ленту, отписка вычищает её'''
+        post = Post.objects.create(
+            text='Текст тестового поста',
+            author=self.author
+        )
+        self.reader_client.get(
+            reverse('profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(self.feed(), [post])
+        self.reader_client.get(
+            reverse('profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(FeedEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed(), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_popular_author_is_pulled(self):
+        '''Посты популярных авторов подмешиваются при чтении'''
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(
+            text='Текст тестового поста',
+            author=self.author
+        )
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(self.feed(), [post])
+
+    def test_follow_backfills_all_posts(self):
+        '''Подписка переносит в ленту все горячие посты автора'''
+        posts = [
+            Post.objects.create(text=f'Пост {number}', author=self.author)
+            for number in range(15)
+        ]
+        Follow.objects.create(user=self.reader, author=self.author)
+        entries = FeedEntry.objects.filter(user=self.reader)
+        self.assertEqual(entries.count(), len(posts))
+        self.assertEqual(
+            {entry.post_id: entry.pub_date for entry in entries},
+            {post.pk: post.pub_date for post in posts}
+        )
+        second = self.reader_client.get(
+            reverse('follow_index'), {'page': 2}
+        ).context['page']
+        self.assertEqual(list(second), posts[4::-1])
+
+    def test_popular_posts_merged(self):
+        '''Посты популярного автора вливаются в ленту по дате'''
+        star = User.objects.create_user(username='star')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=star)
+        posts = [
+            Post.objects.create(
+                text=f'Пост {number}',
+                author=star if number % 2 else self.author
+            )
+            for number in range(6)
+        ]
+        with override_settings(FEED_FANOUT_LIMIT=0):
+            feed = self.feed()
+            self.assertEqual(feed, posts[::-1])
+            page = self.reader_client.get(
+                reverse('follow_index'), {'after': ''}
+            ).context['page']
+            self.assertEqual(list(page), posts[::-1])
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_cursor_pages(self):
+        '''Курсор проходит ленту подписок вперёд и назад'''
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(text=f'Пост {number}', author=self.author)
+            for number in range(13)
+        ]
+        url = reverse('follow_index')
+        first = self.reader_client.get(url).context['page']
+        second = self.reader_client.get(
+            url, {'after': first.next_cursor}
+        ).context['page']
+        self.assertEqual(list(first) + list(second), posts[::-1])
+        back = self.reader_client.get(
+            url, {'before': second.previous_cursor}
+        ).context['page']
+        self.assertEqual(list(back), list(first))
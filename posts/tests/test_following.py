@@ -0,0 +1,133 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from posts.feed import follow_feed
+from posts.following import add_followed, followed_ids, is_following
+from posts.models import Follow, Post
+
+
+class FollowingCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_loaded_once(self):
+        '''Множество подписок читается из базы один раз'''
+        Follow.objects.create(user=self.user, author=self.author)
+        with self.assertNumQueries(1):
+            self.assertEqual(followed_ids(self.user.pk), {self.author.pk})
+        with self.assertNumQueries(0):
+            self.assertTrue(is_following(self.user.pk, self.author.pk))
+            self.assertFalse(is_following(self.user.pk, self.other.pk))
+
+    def test_profile_skips_follow_query(self):
+        '''Кнопка подписки в профиле не ходит в таблицу подписок'''
+        Follow.objects.create(user=self.user, author=self.author)
+        followed_ids(self.user.pk)
+        url = reverse('profile', args=[self.author.username])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, 'Отписаться')
+        table = Follow._meta.db_table
+        self.assertFalse(any(
+            table in query['sql'] for query in queries.captured_queries
+        ))
+
+    def test_stale_cache_follow(self):
+        '''Подписка, о которой кэш не знал, возвращается в множество'''
+        followed_ids(self.user.pk)
+        Follow.objects.bulk_create([
+            Follow(user=self.user, author=self.author)
+        ])
+        self.client.get(
+            reverse('profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 1)
+        self.assertTrue(is_following(self.user.pk, self.author.pk))
+
+    def test_stale_cache_unfollow(self):
+        '''Отписка удаляет подписку, даже если кэш о ней не знал'''
+        followed_ids(self.user.pk)
+        Follow.objects.bulk_create([
+            Follow(user=self.user, author=self.author)
+        ])
+        self.client.get(
+            reverse('profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+
+    def test_phantom_follow_removed(self):
+        '''Подписка есть только в кэше: отписка убирает её оттуда'''
+        followed_ids(self.user.pk)
+        add_followed(self.user.pk, self.author.pk)
+        self.client.get(
+            reverse('profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(is_following(self.user.pk, self.author.pk))
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_feed_popular_authors(self):
+        '''Посты популярных авторов берутся по множеству из кэша'''
+        post = Post.objects.create(text='Текст', author=self.author)
+        Post.objects.create(text='Чужой', author=self.other)
+        Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.create(user=self.other, author=self.other)
+        self.assertEqual(list(follow_feed(self.user)), [post])
+        Follow.objects.filter(user=self.user).delete()
+        cache.clear()
+        self.assertEqual(list(follow_feed(self.user)), [])
+
+
+class FollowingCommitTests(TransactionTestCase):
+    '''Кэш правится в on_commit, поэтому нужны настоящие коммиты'''
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_updated_in_place(self):
+        '''Подписка и отписка правят загруженное множество'''
+        followed_ids(self.user.pk)
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        with self.assertNumQueries(0):
+            self.assertTrue(is_following(self.user.pk, self.author.pk))
+        follow.delete()
+        with self.assertNumQueries(0):
+            self.assertFalse(is_following(self.user.pk, self.author.pk))
+
+    def test_follow_views(self):
+        '''Повторная подписка и лишняя отписка ничего не ломают'''
+        follow = reverse('profile_follow', args=[self.author.username])
+        unfollow = reverse('profile_unfollow', args=[self.author.username])
+        self.client.get(follow)
+        self.client.get(follow)
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 1)
+        self.assertTrue(is_following(self.user.pk, self.author.pk))
+        self.client.get(unfollow)
+        self.client.get(unfollow)
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+        self.assertFalse(is_following(self.user.pk, self.author.pk))
+
+    def test_rollback_keeps_cache(self):
+        '''Откаченная подписка не попадает в кэш'''
+        followed_ids(self.user.pk)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Follow.objects.create(user=self.user, author=self.author)
+                raise RuntimeError
+        self.assertFalse(is_following(self.user.pk, self.author.pk))
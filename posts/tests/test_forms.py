@@ -1,5 +1,7 @@
 import shutil
 import tempfile
+from io import BytesIO
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth.models import User
@@ -7,6 +9,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase
 from django.test.utils import override_settings
 from django.urls import reverse
+from PIL import Image, JpegImagePlugin
 
 from posts.forms import PostForm
 from posts.models import Comment, Group, Post
@@ -169,6 +172,86 @@ class PostFormTests(TestCase):
         self.assertEqual(last_object.post.id, post.id)
 
 
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR),
+    POST_IMAGE_MAX_SIDE=100,
+    POST_IMAGE_MAX_PIXELS=200 * 200,
+)
+class PostImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser1',
+            password='12345'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def upload(self, image_format, size, **save_options):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(
+            buffer,
+            image_format,
+            **save_options
+        )
+        extension = image_format.lower()
+        return self.authorized_client.post(
+            reverse('new_post'),
+            data={
+                'text': 'Текст тестового поста',
+                'image': SimpleUploadedFile(
+                    name=f'photo.{extension}',
+                    content=buffer.getvalue(),
+                    content_type=f'image/{extension}'
+                ),
+            }
+        )
+
+    def test_oversized_image_downscaled(self):
+        '''Большая картинка уменьшается, EXIF вырезается'''
+        exif = Image.Exif()
+        exif[0x010F] = 'Камера'
+        self.upload('JPEG', (400, 200), exif=exif.tobytes())
+        post = Post.objects.get(author=self.user)
+        self.assertEqual((post.image_width, post.image_height), (100, 50))
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (100, 50))
+            self.assertNotIn('exif', image.info)
+
+    def test_mpo_saved_as_jpeg(self):
+        '''Снимок телефона в формате MPO уменьшается и сохраняется как JPEG'''
+        with mock.patch.object(JpegImagePlugin.JpegImageFile, 'format', 'MPO'):
+            self.upload('JPEG', (400, 200))
+        post = Post.objects.get(author=self.user)
+        with Image.open(post.image.path) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (100, 50)))
+
+    def test_small_image_kept(self):
+        '''Небольшая картинка сохраняется как есть'''
+        self.upload('PNG', (80, 60))
+        post = Post.objects.get(author=self.user)
+        self.assertEqual((post.image_width, post.image_height), (80, 60))
+
+    def test_too_many_pixels_rejected(self):
+        '''Картинка с огромным разрешением отклоняется до распаковки'''
+        response = self.upload('PNG', (300, 300))
+        self.assertFalse(Post.objects.filter(author=self.user).exists())
+        self.assertFormError(
+            response,
+            'form',
+            'image',
+            'Слишком большое разрешение: 300x300'
+        )
+
+
 class FormFieldsTests(TestCase):
     @classmethod
     def setUpClass(cls):
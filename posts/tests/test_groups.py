@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, GroupStats, Post
+
+
+class GroupDirectoryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-group', description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа', slug='other-group', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def stats(self, group):
+        return GroupStats.objects.get(group=group)
+
+    def create_post(self, group, text='Текст'):
+        return Post.objects.create(text=text, author=self.user, group=group)
+
+    def test_stats_follow_posts(self):
+        '''Статистика меняется при создании, переносе и удалении поста'''
+        self.assertEqual(self.stats(self.group).posts_count, 0)
+        first = self.create_post(self.group)
+        second = self.create_post(self.group)
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.last_post, second)
+        self.assertEqual(stats.last_activity, second.pub_date)
+        second.group = self.other_group
+        second.save()
+        self.assertEqual(self.stats(self.group).last_post, first)
+        self.assertEqual(self.stats(self.other_group).posts_count, 1)
+        first.delete()
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 0)
+        self.assertIsNone(stats.last_post)
+        self.assertIsNone(stats.last_activity)
+
+    def test_recount(self):
+        '''recount_counters исправляет разошедшуюся статистику'''
+        post = self.create_post(self.group)
+        GroupStats.objects.all().delete()
+        call_command('recount_counters', stdout=StringIO())
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.last_post, post)
+        self.assertEqual(self.stats(self.other_group).posts_count, 0)
+
+    def test_directory(self):
+        '''Каталог показывает группы по свежести с превью записи'''
+        self.create_post(self.other_group, 'Свежая запись')
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('groups'))
+        self.assertEqual(
+            [stats.group for stats in response.context['page']],
+            [self.other_group, self.group]
+        )
+        self.assertContains(response, 'Свежая запись')
+        self.assertContains(response, 'Записей: 1')
+
+    def test_directory_cached_until_write(self):
+        '''Каталог кэшируется до записи в любой группе'''
+        url = reverse('groups')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertNotContains(response, 'Новая запись')
+        etag = response['ETag']
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        self.create_post(self.group, 'Новая запись')
+        self.assertContains(self.client.get(url), 'Новая запись')
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+from http import HTTPStatus
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.live import Hub
+from posts.models import Follow, Post
+
+
+@override_settings(
+    LIVE_STREAM_TIMEOUT=0.3,
+    LIVE_HEARTBEAT=0.1,
+    LIVE_POLL_INTERVAL=0.05,
+    LIVE_LONG_POLL_TIMEOUT=0.1
+)
+class LivePostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.since = Post.objects.create(text='Старый пост', author=cls.author)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def poll(self, client, feed='index'):
+        return client.get(reverse('live_posts'), {
+            'mode': 'poll',
+            'feed': feed,
+            'since': self.since.pk,
+        }).json()
+
+    def test_poll_reports_new_posts(self):
+        '''Long-poll сообщает число новых постов'''
+        self.assertEqual(self.poll(self.reader_client)['count'], 0)
+        post = Post.objects.create(text='Новый пост', author=self.stranger)
+        self.assertEqual(
+            self.poll(self.reader_client),
+            {'count': 1, 'last_id': post.pk}
+        )
+
+    def test_follow_feed_counts_followed_authors(self):
+        '''Для ленты подписок считаются только посты авторов из подписок'''
+        Post.objects.create(text='Чужой пост', author=self.stranger)
+        Post.objects.create(text='Пост автора', author=self.author)
+        self.assertEqual(self.poll(self.reader_client, 'follow')['count'], 1)
+
+    def test_anonymous_gets_no_content(self):
+        '''Анонимы не получают ни поток, ни long-poll ни для одной ленты'''
+        for params in ({'feed': 'index'}, {'feed': 'follow'},
+                       {'feed': 'index', 'mode': 'poll'}):
+            with self.subTest(params=params):
+                response = self.guest_client.get(
+                    reverse('live_posts'), params
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+
+    def test_stream_only_for_users(self):
+        '''Анонимная главная не открывает поток и не держит воркер'''
+        response = self.guest_client.get(reverse('index'))
+        self.assertNotContains(response, 'EventSource')
+        response = self.reader_client.get(reverse('index'))
+        self.assertContains(response, 'EventSource')
+
+    def test_event_stream(self):
+        '''Поток SSE присылает событие о новых постах'''
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        response = self.reader_client.get(
+            reverse('live_posts'),
+            HTTP_LAST_EVENT_ID=str(self.since.pk)
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'id: {post.pk}\nevent: posts\n', body)
+        data = body.split('data: ')[1].split('\n')[0]
+        self.assertEqual(json.loads(data)['count'], 1)
+        self.assertIn(': ping', body)
+
+    def test_hub_wakes_waiters(self):
+        '''Публикация будит ждущий поток сразу, а не по таймауту'''
+        hub = Hub()
+        threading.Timer(0.05, hub.publish, args=[1]).start()
+        start = time.monotonic()
+        self.assertTrue(hub.wait(0, timeout=5))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(hub.wait(1, timeout=0.01))
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Post
+from posts.querycount import assert_query_budget
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=cls.user
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_conditional_headers(self):
+        '''Анонимы получают ETag, повтор с ним — 304'''
+        urls = (
+            reverse('index'),
+            reverse('profile', args=[self.user.username]),
+            reverse('post', args=[self.user.username, self.post.id]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+                with assert_query_budget('index', budget=2):
+                    repeat = self.guest_client.get(
+                        url,
+                        HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(repeat.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_edit_not_hidden_by_date(self):
+        '''Правка и комментарий не прячутся за If-Modified-Since'''
+        urls = (
+            reverse('index'),
+            reverse('post', args=[self.user.username, self.post.id]),
+        )
+        since = http_date()
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        self.post.comments.create(author=self.user, text='Комментарий')
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=since
+                )
+                self.assertContains(response, 'Исправленный текст')
+
+    def test_page_served_from_cache(self):
+        '''Повторный анонимный запрос не рендерит шаблон'''
+        first = self.guest_client.get(reverse('index'))
+        Post.objects.filter(pk=self.post.pk).update(text='Обновлённый текст')
+        second = self.guest_client.get(reverse('index'))
+        self.assertIsNone(second.context)
+        self.assertEqual(first.content, second.content)
+
+    def test_write_changes_etag(self):
+        '''Новый пост меняет ETag и содержимое страницы'''
+        first = self.guest_client.get(reverse('index'))
+        Post.objects.create(text='Текст нового поста', author=self.user)
+        second = self.guest_client.get(
+            reverse('index'),
+            HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(second.status_code, HTTPStatus.OK)
+        self.assertContains(second, 'Текст нового поста')
+
+    def test_authorized_not_cached(self):
+        '''Авторизованные получают персональную страницу без ETag'''
+        response = self.authorized_client.get(reverse('index'))
+        self.assertFalse(response.has_header('ETag'))
+        self.assertContains(response, 'Редактировать')
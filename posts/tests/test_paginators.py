@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.paginators import CursorPage, CursorPaginator
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Текст поста {i}', author=cls.user) for i in range(25)
+        )
+        # у всех постов одинаковый pub_date — порядок держится на id
+        cls.posts = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_walk_forward_and_back(self):
+        '''Проход по курсорам вперёд и назад без пропусков и повторов'''
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        first = paginator.get_page()
+        self.assertEqual(list(first), self.posts[:10])
+        self.assertFalse(first.has_previous())
+        second = paginator.get_page(after=first.next_cursor)
+        self.assertEqual(list(second), self.posts[10:20])
+        third = paginator.get_page(after=second.next_cursor)
+        self.assertEqual(list(third), self.posts[20:])
+        self.assertFalse(third.has_next())
+        back = paginator.get_page(before=third.previous_cursor)
+        self.assertEqual(list(back), self.posts[10:20])
+        self.assertTrue(back.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        '''Испорченный курсор отдаёт первую страницу'''
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        page = paginator.get_page(after='не-курсор')
+        self.assertEqual(list(page), self.posts[:10])
+
+    def test_view_uses_cursor_page(self):
+        '''Лента переключается на курсор по ?after='''
+        cursor = CursorPaginator(Post.objects.all(), 10).encode_cursor(
+            self.posts[9]
+        )
+        response = self.guest_client.get(reverse('index'), {'after': cursor})
+        page = response.context['page']
+        self.assertIsInstance(page, CursorPage)
+        self.assertEqual(list(page), self.posts[10:20])
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_cursor_mode_setting(self):
+        '''Настройка CURSOR_PAGINATION включает курсоры во всех лентах'''
+        response = self.guest_client.get(
+            reverse('profile', args=[self.user.username])
+        )
+        page = response.context['page']
+        self.assertIsInstance(page, CursorPage)
+        self.assertContains(response, f'?after={page.next_cursor}')
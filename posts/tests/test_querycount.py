@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from posts.querycount import assert_query_budget
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=cls.user
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_middleware_counts_queries(self):
+        '''Middleware прикладывает к ответу число запросов'''
+        response = self.guest_client.get(
+            reverse('post', args=[self.user.username, self.post.id])
+        )
+        self.assertGreater(response.query_count, 0)
+        self.assertGreaterEqual(response.query_duration, 0)
+
+    def test_post_view_within_budget(self):
+        '''Страница поста укладывается в свой бюджет'''
+        with assert_query_budget('post'):
+            self.guest_client.get(
+                reverse('post', args=[self.user.username, self.post.id])
+            )
+
+    def test_feeds_within_budget(self):
+        '''Ленты из 10 постов не зависят от числа постов на странице'''
+        group = Group.objects.create(
+            title='Заголовок тестовой группы',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        for i in range(10):
+            post = Post.objects.create(
+                text=f'Текст поста {i}',
+                author=self.user,
+                group=group
+            )
+            Comment.objects.create(post=post, author=reader, text='Текст')
+        reader_client = Client()
+        reader_client.force_login(reader)
+        urls = {
+            'index': reverse('index'),
+            'group': reverse('group', args=[group.slug]),
+            'profile': reverse('profile', args=[self.user.username]),
+            'post': reverse('post', args=[self.user.username, post.id]),
+            'follow_index': reverse('follow_index'),
+        }
+        for url_name, url in urls.items():
+            with self.subTest(url_name=url_name):
+                cache.clear()
+                with assert_query_budget(url_name):
+                    reader_client.get(url)
+
+    def test_budget_exceeded(self):
+        '''Помощник падает при превышении бюджета'''
+        with self.assertRaises(AssertionError):
+            with assert_query_budget('index', budget=0):
+                self.guest_client.get(reverse('index'))
+
+    def test_write_views_within_budget(self):
+        '''Записи с раскладкой, счётчиками и популярным — в бюджете'''
+        group = Group.objects.create(
+            title='Заголовок тестовой группы',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        Post.objects.create(text='Первый пост', author=self.user, group=group)
+        author_client = Client()
+        author_client.force_login(self.user)
+        reader_client = Client()
+        reader_client.force_login(reader)
+        with assert_query_budget('new_post'):
+            author_client.post(
+                reverse('new_post'),
+                {'text': 'Текст нового поста', 'group': group.pk}
+            )
+        post = Post.objects.latest('pub_date')
+        requests = (
+            ('post_edit', author_client, reverse(
+                'post_edit', args=[self.user.username, post.pk]
+            ), {'text': 'Новый текст', 'group': group.pk}),
+            ('add_comment', reader_client, reverse(
+                'add_comment', args=[self.user.username, post.pk]
+            ), {'text': 'Комментарий'}),
+            ('profile_unfollow', reader_client, reverse(
+                'profile_unfollow', args=[self.user.username]
+            ), None),
+            ('profile_follow', reader_client, reverse(
+                'profile_follow', args=[self.user.username]
+            ), None),
+        )
+        for url_name, client, url, data in requests:
+            with self.subTest(url_name=url_name):
+                with assert_query_budget(url_name):
+                    if data is None:
+                        client.get(url)
+                    else:
+                        client.post(url, data)
+        self.assertTrue(Follow.objects.filter(user=reader).exists())
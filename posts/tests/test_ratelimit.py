@@ -0,0 +1,83 @@
+import time
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.ratelimit import take_tokens
+
+LIMITS = {'add_comment': {'user': '2/m', 'ip': '3/m'}}
+
+
+@override_settings(RATELIMITS=LIMITS)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.other = User.objects.create_user(username='other')
+        cls.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('add_comment', args=[self.user.username,
+                                                self.post.id])
+
+    def comment(self, client=None):
+        return (client or self.client).post(self.url, {'text': 'Текст'})
+
+    def test_user_limit(self):
+        '''Сверх лимита пользователь получает 429 с Retry-After'''
+        for _ in range(2):
+            self.assertEqual(self.comment().status_code, HTTPStatus.FOUND)
+        response = self.comment()
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(self.post.comments.count(), 2)
+
+    def test_ip_limit_shared(self):
+        '''Лимит по IP общий для всех пользователей адреса'''
+        other = Client()
+        other.force_login(self.other)
+        self.comment()
+        self.comment()
+        self.assertEqual(self.comment(other).status_code, HTTPStatus.FOUND)
+        self.assertEqual(
+            self.comment(other).status_code,
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def test_tokens_refill(self):
+        '''Ведро пополняется со временем'''
+        buckets = {'rl:test': '2/m'}
+        now = time.time()
+        self.assertEqual(take_tokens(buckets, now), 0)
+        self.assertEqual(take_tokens(buckets, now), 0)
+        self.assertEqual(take_tokens(buckets, now), 30)
+        self.assertEqual(take_tokens(buckets, now + 30), 0)
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_disabled(self):
+        '''Лимиты отключаются настройкой'''
+        for _ in range(3):
+            self.assertEqual(self.comment().status_code, HTTPStatus.FOUND)
+
+    def test_check_overhead(self):
+        '''Проверка двух вёдер укладывается в миллисекунду'''
+        buckets = {'rl:a': '1000000/s', 'rl:b': '1000000/s'}
+        with mock.patch('posts.ratelimit.logger'):
+            start = time.perf_counter()
+            for _ in range(500):
+                take_tokens(buckets)
+            elapsed = (time.perf_counter() - start) / 500
+        self.assertLess(elapsed, 0.001)
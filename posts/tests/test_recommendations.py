@@ -0,0 +1,107 @@
+import random
+import unittest
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Recommendation
+from posts.recommendations import (is_vectorized, python_scores,
+                                   recommended_authors, sparse_scores)
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        names = ('reader', 'a', 'b', 'c', 'd', 'e', 'x')
+        cls.users = {
+            name: User.objects.create_user(username=name) for name in names
+        }
+        for user, author in (('reader', 'a'), ('reader', 'b'), ('a', 'c'),
+                             ('b', 'c'), ('b', 'd'), ('x', 'a'),
+                             ('x', 'e')):
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.reader = self.users['reader']
+        self.client = Client()
+        self.client.force_login(self.reader)
+        call_command('build_recommendations', stdout=StringIO(),
+                     stderr=StringIO())
+
+    def candidates(self):
+        return list(Recommendation.objects.filter(
+            user=self.reader
+        ).order_by('rank').values_list('candidate__username', 'mutual'))
+
+    def test_ranking(self):
+        '''Общие подписки весят больше co-follow, свои подписки исключены'''
+        self.assertEqual(
+            self.candidates(), [('c', 2), ('d', 1), ('e', 0)]
+        )
+        scores = Recommendation.objects.filter(
+            user=self.reader
+        ).order_by('rank').values_list('score', flat=True)
+        self.assertEqual(list(scores), [2.0, 1.0, 0.5])
+
+    def test_rebuild_replaces(self):
+        '''Повторный расчёт заменяет таблицу целиком'''
+        Follow.objects.create(user=self.reader, author=self.users['c'])
+        call_command('build_recommendations', limit=1, stdout=StringIO(),
+                     stderr=StringIO())
+        self.assertEqual(self.candidates(), [('d', 1)])
+        self.assertEqual(Recommendation.objects.filter(
+            user=self.users['x']
+        ).count(), 1)
+
+    def test_one_query(self):
+        '''Страница читает рекомендации одним запросом'''
+        with self.assertNumQueries(1):
+            # множество подписок уже в кэше
+            cache.set(f'following:{self.reader.pk}', frozenset())
+            names = [
+                recommendation.candidate.username
+                for recommendation in recommended_authors(self.reader)
+            ]
+        self.assertEqual(names, ['c', 'd', 'e'])
+
+    def test_followed_since_hidden(self):
+        '''Подписка после расчёта сразу убирает кандидата'''
+        Follow.objects.create(user=self.reader, author=self.users['c'])
+        response = self.client.get(reverse('follow_index'))
+        names = [
+            recommendation.candidate.username
+            for recommendation in response.context['recommendations']
+        ]
+        self.assertEqual(names, ['d', 'e'])
+
+    def test_pages(self):
+        '''Рекомендации видны в профиле и ленте подписок'''
+        link = reverse('profile', args=['d'])
+        for url in (reverse('profile', args=['a']), reverse('follow_index')):
+            self.assertContains(self.client.get(url), link)
+        anonymous = Client().get(reverse('profile', args=['a']))
+        self.assertNotContains(anonymous, 'Кого почитать')
+
+    @unittest.skipUnless(is_vectorized(), 'нужны numpy и scipy')
+    def test_sparse_matches_python(self):
+        '''Матричный расчёт совпадает с расчётом на словарях'''
+        generator = random.Random(7)
+        edges = {
+            (generator.randrange(60), generator.randrange(60))
+            for _ in range(600)
+        }
+        edges = [(user, author) for user, author in edges if user != author]
+        expected = list(python_scores(edges, 0.5, 10))
+        actual = list(sparse_scores(edges, 0.5, 10, chunk_size=7))
+        self.assertEqual(
+            [(user, [(c, m) for c, _, m in row]) for user, row in actual],
+            [(user, [(c, m) for c, _, m in row]) for user, row in expected]
+        )
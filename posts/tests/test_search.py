@@ -0,0 +1,95 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.paginators import CursorPage
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='12345',
+            is_staff=True,
+            is_superuser=True
+        )
+        cls.exact = Post.objects.create(
+            text='Котики котики котики',
+            author=cls.user
+        )
+        cls.other = Post.objects.create(
+            text='Про собак и одного котика',
+            author=cls.user
+        )
+        Post.objects.create(text='Совсем другой текст', author=cls.user)
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def search(self, query, **params):
+        return self.guest_client.get(reverse('search'), {'q': query, **params})
+
+    def test_ranked_results(self):
+        '''Поиск находит посты по префиксу и ранжирует их'''
+        response = self.search('котик')
+        page = response.context['page']
+        self.assertIsInstance(page, CursorPage)
+        self.assertEqual(list(page), [self.exact, self.other])
+        self.assertTemplateUsed(response, 'includes/post.html')
+
+    def test_index_follows_edits(self):
+        '''Индекс обновляется при изменении и удалении поста'''
+        Post.objects.filter(pk=self.other.pk).update(text='Только собаки')
+        self.assertEqual(list(self.search('котик').context['page']),
+                         [self.exact])
+        self.assertEqual(list(self.search('собаки').context['page']),
+                         [self.other])
+        Post.objects.filter(pk=self.exact.pk).delete()
+        self.assertEqual(list(self.search('котик').context['page']), [])
+
+    def test_keyset_pages(self):
+        '''Результаты листаются курсором без повторов'''
+        Post.objects.bulk_create(
+            Post(text=f'Слон номер {i}', author=self.user) for i in range(15)
+        )
+        first = self.search('слон').context['page']
+        second = self.search('слон', after=first.next_cursor).context['page']
+        self.assertEqual(len(first), 10)
+        self.assertEqual(len(second), 5)
+        self.assertFalse(set(first) & set(second))
+        self.assertFalse(second.has_next())
+
+    def test_syntax_is_escaped(self):
+        '''Спецсимволы FTS5 в запросе не ломают поиск'''
+        response = self.search('"котик* (')
+        self.assertEqual(list(response.context['page']),
+                         [self.exact, self.other])
+
+    def test_admin_search(self):
+        '''Поиск в админке идёт по тому же индексу'''
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('admin:posts_post_changelist'),
+            {'q': 'собак'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list),
+            [self.other]
+        )
+
+    def test_admin_search_without_words(self):
+        '''Запрос без слов в админке не доходит до FTS5'''
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('admin:posts_post_changelist'),
+            {'q': '!!!'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [])
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.forms import PostForm
+from posts.models import Post
+from posts.sqlite import retry_on_locked, write_transaction
+
+
+class SQLitePragmaTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        '''Прагмы из настроек выставляются на каждом соединении'''
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma('temp_store'), 2)
+
+
+@override_settings(SQLITE_RETRY_DELAY=0)
+class RetryOnLockedTests(TransactionTestCase):
+    def test_retries_locked_writes(self):
+        '''Запись, упавшая на блокировке, повторяется'''
+        calls = mock.Mock(__name__='view', side_effect=[
+            OperationalError('database is locked'),
+            OperationalError('database is locked'),
+            'ok',
+        ])
+        self.assertEqual(retry_on_locked(calls)(), 'ok')
+        self.assertEqual(calls.call_count, 3)
+
+    @override_settings(SQLITE_WRITE_RETRIES=1)
+    def test_gives_up(self):
+        '''После исчерпания попыток ошибка пробрасывается'''
+        calls = mock.Mock(
+            __name__='view',
+            side_effect=OperationalError('database is locked')
+        )
+        with self.assertRaises(OperationalError):
+            retry_on_locked(calls)()
+        self.assertEqual(calls.call_count, 2)
+
+    def test_other_errors_not_retried(self):
+        '''Прочие ошибки БД не повторяются'''
+        calls = mock.Mock(side_effect=OperationalError('no such table'))
+        with self.assertRaises(OperationalError):
+            retry_on_locked(calls)()
+        self.assertEqual(calls.call_count, 1)
+
+    def test_lock_only_for_writes(self):
+        '''GET формы не берёт блокировку на запись, POST берёт один раз'''
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(text='Пост', author=author)
+        client = Client()
+        client.force_login(author)
+        edit_url = reverse('post_edit', args=['author', post.pk])
+        with mock.patch(
+            'posts.sqlite.write_transaction', wraps=write_transaction
+        ) as locked:
+            client.get(reverse('new_post'))
+            client.get(edit_url)
+            self.assertEqual(locked.call_count, 0)
+            client.post(edit_url, {'text': 'Исправленный пост'})
+            self.assertEqual(locked.call_count, 1)
+
+    def test_post_views_retried(self):
+        '''Создание и правка поста повторяются после блокировки'''
+        author = User.objects.create_user(username='author')
+        client = Client()
+        client.force_login(author)
+        save = PostForm.save
+        failures = []
+
+        def locked_once(form, *args, **kwargs):
+            if not failures:
+                failures.append(form)
+                raise OperationalError('database is locked')
+            return save(form, *args, **kwargs)
+
+        with mock.patch.object(PostForm, 'save', locked_once):
+            client.post(reverse('new_post'), {'text': 'Новый пост'})
+        post = Post.objects.get()
+        self.assertEqual(post.text, 'Новый пост')
+        failures.clear()
+        with mock.patch.object(PostForm, 'save', locked_once):
+            client.post(
+                reverse('post_edit', args=['author', post.pk]),
+                {'text': 'Исправленный пост'}
+            )
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Исправленный пост')
+        self.assertEqual(len(failures), 1)
+
+    def test_immediate_transaction(self):
+        '''Запись начинается с BEGIN IMMEDIATE'''
+        with mock.patch.object(connection, 'cursor') as cursor:
+            with mock.patch.object(connection, 'commit'):
+                with write_transaction():
+                    pass
+        cursor.return_value.execute.assert_called_with('BEGIN IMMEDIATE')
+        self.assertFalse(connection.immediate_transactions)
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.querycount import assert_query_budget
+
+
+class SyndicationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Заголовок тестовой группы',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=cls.author,
+            group=cls.group
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_feeds_render(self):
+        '''RSS и Atom отдаются для сайта, группы и автора'''
+        urls = (
+            reverse('feed_rss'),
+            reverse('feed_atom'),
+            reverse('group_rss', args=[self.group.slug]),
+            reverse('group_atom', args=[self.group.slug]),
+            reverse('profile_rss', args=[self.author.username]),
+            reverse('profile_atom', args=[self.author.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with assert_query_budget(url, budget=2):
+                    response = self.guest_client.get(url)
+                self.assertContains(response, 'Текст тестового поста')
+                self.assertTrue(response.has_header('ETag'))
+                self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_conditional_get(self):
+        '''Опрос без изменений получает 304 без запросов к базе'''
+        url = reverse('group_atom', args=[self.group.slug])
+        response = self.guest_client.get(url)
+        for header, value in (
+                ('HTTP_IF_NONE_MATCH', response['ETag']),
+                ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified'])):
+            with self.subTest(header=header):
+                with assert_query_budget(url, budget=0):
+                    repeat = self.guest_client.get(url, **{header: value})
+                self.assertEqual(repeat.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_scoped_invalidation(self):
+        '''Запись меняет ленты только своих автора и группы'''
+        urls = {
+            'site': reverse('feed_rss'),
+            'group': reverse('group_rss', args=[self.group.slug]),
+            'author': reverse('profile_rss', args=[self.author.username]),
+            'other': reverse('profile_rss', args=[self.other.username]),
+        }
+        etags = {
+            name: self.guest_client.get(url)['ETag']
+            for name, url in urls.items()
+        }
+        Post.objects.create(text='Пост без группы', author=self.author)
+        changed = {
+            name for name, url in urls.items()
+            if self.guest_client.get(url)['ETag'] != etags[name]
+        }
+        self.assertEqual(changed, {'site', 'author'})
+
+    def test_moving_post_invalidates_old_group(self):
+        '''Перенос поста в другую группу обновляет ленту старой группы'''
+        url = reverse('group_rss', args=[self.group.slug])
+        etag = self.guest_client.get(url)['ETag']
+        self.post.group = None
+        self.post.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotContains(response, 'Текст тестового поста')
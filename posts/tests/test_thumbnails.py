@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.cache import feed_version
+from posts.models import Post
+from posts.thumbnails import (_pending, _run, cached_thumbnail, enqueue,
+                              generate)
+from posts.variants import srcsets
+
+
+def make_image(name='photo.jpg', size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'blue').save(buffer, 'JPEG')
+    return SimpleUploadedFile(
+        name=name,
+        content=buffer.getvalue(),
+        content_type='image/jpeg'
+    )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=self.user,
+            image=make_image()
+        )
+
+    def test_placeholder_until_ready(self):
+        '''Пока миниатюры нет, выводится заглушка и ставится задача'''
+        with mock.patch('posts.templatetags.post_images.enqueue') as enqueue:
+            response = self.guest_client.get(reverse('index'))
+        enqueue.assert_called_once_with(self.post.image.name)
+        self.assertContains(response, 'card-img bg-light')
+
+    def test_ready_thumbnail_rendered(self):
+        '''Готовая миниатюра выводится без генерации в запросе'''
+        self.assertTrue(generate(self.post.image.name))
+        thumbnail = cached_thumbnail(self.post.image)
+        with mock.patch('posts.templatetags.post_images.enqueue') as enqueue:
+            response = self.guest_client.get(reverse('index'))
+        enqueue.assert_not_called()
+        self.assertContains(response, thumbnail.url)
+
+    def test_generate_command(self):
+        '''Команда generate_thumbnails создаёт недостающие миниатюры'''
+        self.assertIsNone(cached_thumbnail(self.post.image))
+        call_command('generate_thumbnails', stdout=StringIO())
+        self.assertIsNotNone(cached_thumbnail(self.post.image))
+
+    def test_generated_in_place(self):
+        '''Без пула enqueue сразу создаёт миниатюру и варианты'''
+        self.assertEqual(settings.THUMBNAIL_WORKERS, 0)
+        version = feed_version()
+        enqueue(self.post.image.name)
+        self.assertIsNotNone(cached_thumbnail(self.post.image))
+        self.assertIsNotNone(srcsets(self.post.image))
+        self.assertNotEqual(feed_version(), version)
+
+    def test_failure_logged(self):
+        '''Ошибка генерации пишется в лог и не блокирует повтор'''
+        with self.assertLogs('posts.thumbnails', 'ERROR'), \
+                self.assertLogs('sorl.thumbnail', 'WARNING'):
+            _run('posts/missing.jpg')
+        self.assertNotIn('posts/missing.jpg', _pending)
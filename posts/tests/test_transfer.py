@@ -0,0 +1,131 @@
+import datetime as dt
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from posts.cache import scope_version
+from posts.feeds import author_scope, group_scope, groups_scope, site_scope
+from posts.models import Comment, FeedEntry, Follow, Group, Post, UserStats
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author',
+            password='12345'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Заголовок тестовой группы',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=cls.author,
+            group=cls.group
+        )
+        cls.pub_date = timezone.now() - dt.timedelta(days=3, microseconds=7)
+        Post.objects.filter(pk=cls.post.pk).update(pub_date=cls.pub_date)
+        Comment.objects.create(post=cls.post, author=cls.reader, text='Текст')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_export_is_jsonl(self):
+        '''Каждая строка выгрузки — отдельный JSON-объект'''
+        call_command('export_yatube', self.path, stderr=StringIO())
+        with open(self.path) as stream:
+            models = [json.loads(line)['model'] for line in stream]
+        self.assertEqual(
+            models,
+            ['user', 'user', 'group', 'post', 'comment', 'follow']
+        )
+
+    def test_round_trip(self):
+        '''Импорт восстанавливает строки, даты, счётчики и ленты'''
+        call_command(
+            'export_yatube', self.path, with_credentials=True,
+            stderr=StringIO()
+        )
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        call_command('import_yatube', self.path, stdout=StringIO())
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.pub_date, self.pub_date)
+        self.assertEqual(post.group.slug, 'test-slug')
+        self.assertEqual(post.comments_count, 1)
+        self.assertTrue(
+            User.objects.get(username='author').check_password('12345')
+        )
+        stats = UserStats.objects.get(user_id=self.author.pk)
+        self.assertEqual((stats.posts_count, stats.followers_count), (1, 1))
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        new_post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertGreater(new_post.pk, post.pk)
+
+    def test_credentials_opt_in(self):
+        '''Email и хэши паролей выгружаются только по явному флагу'''
+        call_command('export_yatube', self.path, stderr=StringIO())
+        with open(self.path) as stream:
+            user = json.loads(stream.readline())
+        self.assertNotIn('password', user)
+        self.assertNotIn('email', user)
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        call_command('import_yatube', self.path, stdout=StringIO())
+        self.assertFalse(
+            User.objects.get(username='author').has_usable_password()
+        )
+
+    def test_import_is_atomic(self):
+        '''Конфликт посреди файла откатывает весь импорт'''
+        call_command('export_yatube', self.path, stderr=StringIO())
+        User.objects.all().delete()
+        with self.assertRaises(IntegrityError):
+            call_command('import_yatube', self.path, stdout=StringIO())
+        self.assertFalse(User.objects.exists())
+
+
+class ImportScopesTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_syndication_refreshed(self):
+        '''Импорт сдвигает версии RSS/Atom сайта, каталога, групп и авторов'''
+        author = User.objects.create_user(username='author')
+        group = Group.objects.create(title='Группа', slug='test-slug')
+        Post.objects.create(text='Текст', author=author, group=group)
+        call_command('export_yatube', self.path, stderr=StringIO())
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        scopes = (site_scope(), groups_scope(), group_scope('test-slug'),
+                  author_scope('author'))
+        versions = [scope_version(scope) for scope in scopes]
+        call_command('import_yatube', self.path, stdout=StringIO())
+        for scope, version in zip(scopes, versions):
+            with self.subTest(scope=scope):
+                self.assertGreater(scope_version(scope), version)
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Group, GroupTrend, Post, PostTrend
+from posts.trending import (EPOCH_KEY, current_epoch, redecay,
+                            trending_posts)
+
+
+@override_settings(TRENDING_POST_WEIGHT=1.0, TRENDING_COMMENT_WEIGHT=2.0,
+                   TRENDING_HALF_LIFE=60 * 60 * 12)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-group', description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа', slug='other-group', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_post(self, group=None):
+        return Post.objects.create(text='Текст', author=self.user, group=group)
+
+    def comment(self, post):
+        return self.client.post(
+            reverse('add_comment', args=[self.user.username, post.pk]),
+            {'text': 'Комментарий'}
+        )
+
+    def score(self, post):
+        return PostTrend.objects.get(pk=post.pk).score
+
+    def test_incremental_scores(self):
+        '''Пост и комментарий прибавляют к оценкам поста и группы'''
+        post = self.create_post(self.group)
+        first = self.score(post)
+        self.assertGreater(first, 0)
+        self.comment(post)
+        self.assertAlmostEqual(self.score(post), first * 3, delta=first * 0.01)
+        self.assertAlmostEqual(
+            GroupTrend.objects.get(pk=self.group.pk).score, self.score(post)
+        )
+
+    def test_ranking(self):
+        '''Обсуждаемый пост выше, топ читается одним запросом'''
+        quiet = self.create_post()
+        busy = self.create_post()
+        self.comment(busy)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(trending_posts()), [busy, quiet])
+
+    def test_newer_wins(self):
+        '''Более свежая активность весит больше прежней'''
+        old = self.create_post()
+        self.comment(old)
+        # тот же вклад двумя полураспадами позже весит вчетверо больше
+        cache.set(EPOCH_KEY, current_epoch() - timedelta(hours=24))
+        new = self.create_post()
+        self.assertAlmostEqual(self.score(new), 4.0, places=2)
+        self.assertEqual(list(trending_posts()), [new, old])
+
+    def test_redecay(self):
+        '''Перенос epoch делит оценки, сохраняя порядок, и чистит угасшие'''
+        quiet = self.create_post()
+        busy = self.create_post()
+        self.comment(busy)
+        epoch = current_epoch()
+        before = self.score(busy) / self.score(quiet)
+        with override_settings(TRENDING_HALF_LIFE=60, TRENDING_MIN_SCORE=0.3):
+            removed = redecay(epoch + timedelta(seconds=120))
+        self.assertEqual(removed, 1)
+        self.assertFalse(PostTrend.objects.filter(pk=quiet.pk).exists())
+        self.assertAlmostEqual(self.score(busy), 0.75, places=2)
+        self.assertGreater(before, 2.9)
+        self.assertEqual(current_epoch(), epoch + timedelta(seconds=120))
+
+    def test_rebuild(self):
+        '''Пересчёт по данным совпадает с накопленными оценками'''
+        post = self.create_post(self.group)
+        self.comment(post)
+        group_score = GroupTrend.objects.get(pk=self.group.pk).score
+        ratio = group_score / self.score(post)
+        call_command('decay_trending', rebuild=True, stdout=StringIO())
+        self.assertAlmostEqual(self.score(post), 3.0, places=2)
+        self.assertAlmostEqual(
+            GroupTrend.objects.get(pk=self.group.pk).score,
+            self.score(post) * ratio
+        )
+
+    def test_pages(self):
+        '''Страницы популярного сайта и группы'''
+        in_group = self.create_post(self.group)
+        elsewhere = self.create_post(self.other_group)
+        self.comment(elsewhere)
+        response = self.client.get(reverse('trending'))
+        self.assertEqual(
+            list(response.context['posts']), [elsewhere, in_group]
+        )
+        self.assertContains(
+            response, reverse('group_trending', args=[self.group.slug])
+        )
+        response = self.client.get(
+            reverse('group_trending', args=[self.group.slug])
+        )
+        self.assertEqual(list(response.context['posts']), [in_group])
+
+    def test_moved_post(self):
+        '''Перенос поста в другую группу переносит его в её топ'''
+        post = self.create_post(self.group)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(list(trending_posts(self.group)), [])
+        self.assertEqual(list(trending_posts(self.other_group)), [post])
+
+    def test_deleted_post(self):
+        '''Удалённый пост пропадает из популярного'''
+        post = self.create_post()
+        Comment.objects.create(post=post, author=self.user, text='Текст')
+        post.delete()
+        self.assertFalse(PostTrend.objects.exists())
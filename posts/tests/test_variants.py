@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+from posts.tests.test_thumbnails import make_image
+from posts.variants import generate_variants, srcsets, variant_names
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class ImageVariantTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Текст тестового поста',
+            author=self.user,
+            image=make_image()
+        )
+
+    def test_variants_created(self):
+        '''Для каждой ширины создаются WebP и JPEG нужного размера'''
+        self.assertTrue(generate_variants(self.post.image.name))
+        names = variant_names(
+            self.post.image.name,
+            settings.IMAGE_VARIANT_WIDTHS
+        )
+        self.assertEqual(len(names), 2 * len(settings.IMAGE_VARIANT_WIDTHS))
+        with Image.open(os.path.join(settings.MEDIA_ROOT, names[0])) as im:
+            self.assertEqual(im.size, (320, 113))
+            self.assertEqual(im.format, 'WEBP')
+        self.assertFalse(generate_variants(self.post.image.name))
+
+    def test_srcset_rendered(self):
+        '''Готовые варианты выводятся через <picture> и srcset'''
+        generate_variants(self.post.image.name)
+        with mock.patch('posts.templatetags.post_images.enqueue') as enqueue:
+            response = self.guest_client.get(reverse('index'))
+        enqueue.assert_not_called()
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, '-640.webp 640w')
+        largest = max(settings.IMAGE_VARIANT_WIDTHS)
+        self.assertContains(response, f'src="{settings.MEDIA_URL}variants/')
+        self.assertContains(response, f'-{largest}.jpg"')
+        self.assertNotContains(response, f'src="{self.post.image.url}"')
+
+    def test_ready_variants_cached(self):
+        '''Готовые варианты не проверяются на диске при каждом выводе'''
+        generate_variants(self.post.image.name)
+        self.assertIsNotNone(srcsets(self.post.image))
+        with mock.patch('posts.variants.os.path.getmtime') as getmtime:
+            self.assertIsNotNone(srcsets(self.post.image))
+        getmtime.assert_not_called()
+
+    def test_command_resumes(self):
+        '''Повторный запуск команды пропускает готовые картинки'''
+        out = StringIO()
+        call_command('generate_image_variants', workers=1, stdout=out)
+        self.assertIn('Создано: 1', out.getvalue())
+        out = StringIO()
+        call_command('generate_image_variants', workers=1, stdout=out)
+        self.assertIn('уже готово: 1', out.getvalue())
@@ -184,13 +184,36 @@ class ViewTests(TestCase):
     def test_cache_template(self):
         """Проверка что кэш работает"""
         response = self.authorized_client.get(reverse('index'))
+        Post.objects.filter(pk=self.post.pk).update(text='Обновлённый текст')
+        response_add = self.authorized_client.get(reverse('index'))
+        self.assertEqual(response.content, response_add.content)
+        cache.clear()
+        response = self.authorized_client.get(reverse('index'))
+        self.assertNotEqual(response.content, response_add.content)
+
+    def test_cache_invalidated_on_write(self):
+        """Новый пост сразу виден, несмотря на кэш"""
+        response = self.authorized_client.get(reverse('index'))
         Post.objects.create(
-            text='Текст тестового поста',
+            text='Текст нового поста',
             author=self.test_user,
             group=self.group,
         )
         response_add = self.authorized_client.get(reverse('index'))
-        self.assertEqual(response.content, response_add.content)
-        cache.clear()
-        response = self.authorized_client.get(reverse('index'))
         self.assertNotEqual(response.content, response_add.content)
+        self.assertContains(response_add, 'Текст нового поста')
+
+    def test_cache_key_depends_on_page_and_user(self):
+        """Кэш различает страницы и пользователей"""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.following) for i in range(10)
+        )
+        cache.clear()
+        first = self.authorized_client.get(reverse('index'))
+        second = self.authorized_client.get(reverse('index'), {'page': 2})
+        self.assertNotEqual(first.content, second.content)
+        self.assertContains(second, 'Редактировать')
+        response = self.following_client.get(
+            reverse('index'), {'page': 2}
+        )
+        self.assertNotContains(response, 'Редактировать')
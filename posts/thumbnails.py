@@ -0,0 +1,98 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from .cache import bump_feed_version
+from .variants import generate_variants
+
+logger = logging.getLogger(__name__)
+
+# Миниатюра карточки поста в includes/post.html
+POST_GEOMETRY = '960x339'
+POST_OPTIONS = {'crop': 'center', 'upscale': True}
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails'
+            )
+        return _executor
+
+
+def cached_thumbnail(image):
+    """Готовая миниатюра поста или None, если её ещё нет."""
+    if not image:
+        return None
+    return lookup_thumbnail(image.name)
+
+
+def lookup_thumbnail(name):
+    """Миниатюра из kvstore sorl без генерации в запросе.
+
+    sorl заносит исходник в kvstore только вместе с созданной миниатюрой.
+    Если исходника там нет, миниатюры тоже нет. Иначе get_thumbnail
+    находит готовую запись в kvstore и ничего не создаёт.
+    """
+    if default.kvstore.get(ImageFile(name)) is None:
+        return None
+    return generate_thumbnail(name)
+
+
+def generate_thumbnail(name):
+    return default.backend.get_thumbnail(name, POST_GEOMETRY, **POST_OPTIONS)
+
+
+def generate(name):
+    return generate_thumbnail(name).exists()
+
+
+def _run(name):
+    try:
+        thumbnail_ready = generate(name)
+        variants_ready = generate_variants(name)
+        if thumbnail_ready or variants_ready:
+            # в закэшированных лентах вместо картинки стоит заглушка
+            bump_feed_version()
+    except Exception:
+        logger.exception('Thumbnail generation failed for %s', name)
+    finally:
+        with _lock:
+            _pending.discard(name)
+
+
+def _run_in_worker(name):
+    try:
+        _run(name)
+    finally:
+        # у потока пула своё соединение с базой
+        connection.close()
+
+
+def enqueue(name):
+    """Ставит миниатюру в очередь пула, не дублируя уже ждущие.
+
+    При THUMBNAIL_WORKERS = 0 миниатюра создаётся сразу, в этом потоке.
+    """
+    if not name:
+        return
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    if settings.THUMBNAIL_WORKERS:
+        _get_executor().submit(_run_in_worker, name)
+    else:
+        _run(name)
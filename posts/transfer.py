@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .cache import bump_feed_version, bump_scope_versions
+from .counters import recount_comments, recount_group_stats, recount_user_stats
+from .feed import rebuild_feed
+from .feeds import author_scope, group_scope, groups_scope, site_scope
+from .models import ArchivedComment, ArchivedPost, Comment, Follow, Group, Post
+from .trending import rebuild_trending
+
+User = get_user_model()
+
+# Порядок важен: при импорте строки идут после тех, на кого ссылаются
+EXPORT_MODELS = (
+    ('user', User, (
+        'id', 'username', 'first_name', 'last_name', 'is_active',
+        'date_joined',
+    )),
+    ('group', Group, ('id', 'title', 'slug', 'description')),
+    ('post', Post, (
+        'id', 'text', 'pub_date', 'author_id', 'group_id', 'image',
+        'image_width', 'image_height',
+    )),
+    ('comment', Comment, ('id', 'post_id', 'author_id', 'text', 'created')),
+    ('archived_post', ArchivedPost, (
+        'id', 'text', 'pub_date', 'author_id', 'group_id', 'image',
+        'image_width', 'image_height', 'comments_count',
+    )),
+    ('archived_comment', ArchivedComment, (
+        'id', 'post_id', 'author_id', 'text', 'created',
+    )),
+    ('follow', Follow, ('id', 'user_id', 'author_id')),
+)
+MODELS = {name: (model, fields) for name, model, fields in EXPORT_MODELS}
+# Персональные данные выгружаются только с export_yatube --with-credentials
+CREDENTIAL_FIELDS = {'user': ('email', 'password')}
+
+
+def to_json(value):
+    # isoformat(), а не DjangoJSONEncoder: тот теряет микросекунды
+    return value.isoformat()
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Даёт bulk_create сохранить даты из выгрузки вместо now()."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def rebuild_after_bulk_load(usernames=(), slugs=()):
+    """Пересчитывает производные данные после загрузки через bulk_create.
+
+    bulk_create не шлёт сигналы: счётчики, ленты и тренды строятся
+    заново. После коммита сдвигаются версии лент и областей RSS/Atom
+    сайта, каталога групп и загруженных групп и авторов, иначе
+    scoped_cache отдавал бы 304 до следующей записи в каждой области.
+    """
+    recount_comments()
+    recount_user_stats()
+    recount_group_stats()
+    rebuild_feed()
+    rebuild_trending()
+    scopes = [
+        site_scope(),
+        groups_scope(),
+        *(group_scope(slug) for slug in slugs),
+        *(author_scope(username) for username in usernames),
+    ]
+
+    def bump():
+        bump_feed_version()
+        bump_scope_versions(*scopes)
+
+    transaction.on_commit(bump)
@@ -0,0 +1,167 @@
+"""Популярные посты и группы с экспоненциальным затуханием.
+
+Вклад события — вес, умноженный на 2 ** ((момент - epoch) / полураспад).
+Так старые оценки не нужно уменьшать на каждом запросе: порядок по
+``score`` уже учитывает возраст, а запись только прибавляет к строке.
+Числа растут вместе со временем, поэтому команда ``decay_trending``
+периодически переносит epoch на «сейчас», делит все оценки на один
+множитель и удаляет угасшие строки.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Comment, GroupTrend, Post, PostTrend, TrendingEpoch
+
+EPOCH_KEY = 'trending:epoch'
+TRENDING_BATCH = 500
+
+
+def current_epoch():
+    epoch = cache.get(EPOCH_KEY)
+    if epoch is None:
+        epoch = TrendingEpoch.objects.get_or_create(
+            pk=1, defaults={'epoch': timezone.now()}
+        )[0].epoch
+        cache.set(EPOCH_KEY, epoch, None)
+    return epoch
+
+
+def decayed(weight, moment, epoch):
+    age = (moment - epoch).total_seconds()
+    return weight * 2 ** (age / settings.TRENDING_HALF_LIFE)
+
+
+def _bump(model, pk, amount, **fields):
+    if model.objects.filter(pk=pk).update(score=F('score') + amount):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(pk=pk, score=amount, **fields)
+    except IntegrityError:
+        model.objects.filter(pk=pk).update(score=F('score') + amount)
+
+
+def _add(post_id, group_id, weight, moment, created=False):
+    amount = decayed(weight, moment, current_epoch())
+    if created:
+        # у нового поста строки ещё нет: хватит одного INSERT
+        PostTrend.objects.create(pk=post_id, score=amount, group_id=group_id)
+    else:
+        _bump(PostTrend, post_id, amount, group_id=group_id)
+    if group_id is not None:
+        _bump(GroupTrend, group_id, amount)
+
+
+def post_created(post):
+    _add(post.pk, post.group_id, settings.TRENDING_POST_WEIGHT,
+         post.pub_date, created=True)
+
+
+def comment_created(comment):
+    _add(comment.post_id, comment.post.group_id,
+         settings.TRENDING_COMMENT_WEIGHT, comment.created)
+
+
+def post_moved(post_id, group_id):
+    """Пост перенесли в другую группу: его оценка уходит вместе с ним."""
+    PostTrend.objects.filter(pk=post_id).update(group_id=group_id)
+
+
+def redecay(now=None):
+    """Переносит epoch на now; возвращает число удалённых строк."""
+    now = now or timezone.now()
+    removed = 0
+    with transaction.atomic():
+        clock, _ = TrendingEpoch.objects.select_for_update().get_or_create(
+            pk=1, defaults={'epoch': now}
+        )
+        factor = 2 ** (
+            -(now - clock.epoch).total_seconds() / settings.TRENDING_HALF_LIFE
+        )
+        for model in (PostTrend, GroupTrend):
+            model.objects.update(score=F('score') * factor)
+            removed += model.objects.filter(
+                score__lt=settings.TRENDING_MIN_SCORE
+            ).delete()[0]
+        clock.epoch = now
+        clock.save()
+    cache.set(EPOCH_KEY, now, None)
+    return removed
+
+
+def rebuild_trending(now=None):
+    """Пересчитывает оценки по постам и комментариям, например после импорта.
+
+    События старше окна всё равно угасли бы ниже TRENDING_MIN_SCORE.
+    """
+    now = now or timezone.now()
+    heaviest = max(settings.TRENDING_POST_WEIGHT,
+                   settings.TRENDING_COMMENT_WEIGHT)
+    window = settings.TRENDING_HALF_LIFE * math.log2(
+        heaviest / settings.TRENDING_MIN_SCORE
+    )
+    since = now - timedelta(seconds=window)
+    posts, groups, post_groups = defaultdict(float), defaultdict(float), {}
+    events = (
+        (Post.objects.filter(pub_date__gte=since).values_list(
+            'pk', 'group_id', 'pub_date'
+        ), settings.TRENDING_POST_WEIGHT),
+        (Comment.objects.filter(created__gte=since).values_list(
+            'post_id', 'post__group_id', 'created'
+        ), settings.TRENDING_COMMENT_WEIGHT),
+    )
+    for rows, weight in events:
+        for post_id, group_id, moment in rows.iterator():
+            amount = decayed(weight, moment, now)
+            posts[post_id] += amount
+            post_groups[post_id] = group_id
+            if group_id is not None:
+                groups[group_id] += amount
+    with transaction.atomic():
+        PostTrend.objects.all().delete()
+        GroupTrend.objects.all().delete()
+        TrendingEpoch.objects.update_or_create(
+            pk=1, defaults={'epoch': now}
+        )
+        PostTrend.objects.bulk_create(
+            (
+                PostTrend(post_id=post_id, group_id=post_groups[post_id],
+                          score=score)
+                for post_id, score in posts.items()
+                if score >= settings.TRENDING_MIN_SCORE
+            ),
+            batch_size=TRENDING_BATCH
+        )
+        GroupTrend.objects.bulk_create(
+            (
+                GroupTrend(group_id=group_id, score=score)
+                for group_id, score in groups.items()
+                if score >= settings.TRENDING_MIN_SCORE
+            ),
+            batch_size=TRENDING_BATCH
+        )
+    cache.set(EPOCH_KEY, now, None)
+    return len(posts)
+
+
+def trending_posts(group=None, limit=None):
+    """Топ постов одним запросом по индексу (-score) или (group, -score)."""
+    posts = Post.objects.for_feed().filter(trend__score__gt=0)
+    if group is not None:
+        posts = posts.filter(trend__group=group)
+    return posts.order_by('-trend__score')[
+        :limit or settings.TRENDING_SIZE
+    ]
+
+
+def trending_groups(limit=None):
+    return GroupTrend.objects.select_related('group').order_by('-score')[
+        :limit or settings.TRENDING_SIZE
+    ]
@@ -0,0 +1,71 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image, ImageOps
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True},
+    'WEBP': {'quality': 85},
+}
+
+
+def pixel_limit(image_format):
+    # JPEG декодируется в draft-режиме в уменьшенном масштабе,
+    # остальные форматы распаковываются целиком
+    if image_format == 'JPEG':
+        return settings.POST_IMAGE_MAX_DRAFT_PIXELS
+    return settings.POST_IMAGE_MAX_PIXELS
+
+
+def process_image(uploaded):
+    """Проверяет и нормализует загруженную картинку поста.
+
+    Размеры читаются из заголовка до распаковки, слишком большие картинки
+    отклоняются. Картинки крупнее POST_IMAGE_MAX_SIDE уменьшаются, а EXIF
+    вырезается. Результат пишется во временный файл на диске. Возвращает
+    ``(файл, ширина, высота)``.
+    """
+    if uploaded.size > settings.POST_IMAGE_MAX_BYTES:
+        raise ValidationError(
+            'Файл слишком большой: не больше %(limit)d МБ',
+            code='file_too_large',
+            params={'limit': settings.POST_IMAGE_MAX_BYTES // 2 ** 20},
+        )
+    uploaded.seek(0)
+    with Image.open(uploaded) as image:
+        width, height = image.size
+        image_format = image.format
+        if image_format == 'MPO':
+            # снимки телефонов: первый кадр — обычный JPEG, он так же
+            # декодируется в draft-режиме, а сохранять MPO Pillow 7 не умеет
+            image_format = 'JPEG'
+        if width * height > pixel_limit(image_format):
+            raise ValidationError(
+                'Слишком большое разрешение: %(width)dx%(height)d',
+                code='too_many_pixels',
+                params={'width': width, 'height': height},
+            )
+        max_side = settings.POST_IMAGE_MAX_SIDE
+        if max(width, height) <= max_side and 'exif' not in image.info:
+            uploaded.seek(0)
+            return uploaded, width, height
+
+        image.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        result = TemporaryUploadedFile(
+            uploaded.name,
+            uploaded.content_type,
+            0,
+            None
+        )
+        # exif не передаётся в save(), поэтому в файл он не попадает
+        image.save(result, image_format, **SAVE_OPTIONS.get(image_format, {}))
+        result.flush()
+        result.size = os.path.getsize(result.temporary_file_path())
+        result.seek(0)
+        return result, image.width, image.height
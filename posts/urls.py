@@ -1,22 +1,42 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 urlpatterns = [
     path('new/', views.new_post, name='new_post'),
+    path('feeds/rss/', feeds.LatestPostsFeed(), name='feed_rss'),
+    path('feeds/atom/', feeds.LatestPostsAtomFeed(), name='feed_atom'),
+    path('groups/', views.group_index, name='groups'),
     path('group/<slug>/', views.group_posts, name='group'),
+    path(
+        'group/<slug>/trending/',
+        views.group_trending,
+        name='group_trending'
+    ),
+    path('group/<slug>/rss/', feeds.GroupFeed(), name='group_rss'),
+    path('group/<slug>/atom/', feeds.GroupAtomFeed(), name='group_atom'),
+    path('search/', views.search, name='search'),
+    path('trending/', views.trending, name='trending'),
+    path('live/', views.live_posts, name='live_posts'),
     path(
         'follow/',
         views.follow_index,
         name='follow_index'
     ),
     path('<str:username>/', views.profile, name='profile'),
+    path('<str:username>/rss/', feeds.AuthorFeed(), name='profile_rss'),
+    path('<str:username>/atom/', feeds.AuthorAtomFeed(), name='profile_atom'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
     path(
         '<str:username>/<int:post_id>/edit/',
         views.post_edit,
         name='post_edit'
     ),
+    path(
+        '<str:username>/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         '<username>/<int:post_id>/comment/',
         views.add_comment,
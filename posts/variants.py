@@ -0,0 +1,119 @@
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image
+
+# Пропорции карточки поста, как у миниатюры 960x339
+RATIO = 339 / 960
+FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+VARIANTS_DIR = 'variants'
+
+
+def variant_name(image_name, width, extension):
+    stem = os.path.splitext(image_name)[0]
+    return f'{VARIANTS_DIR}/{stem}-{width}.{extension}'
+
+
+def variant_names(image_name, widths):
+    return [
+        variant_name(image_name, width, extension)
+        for width in widths
+        for extension, _ in FORMATS
+    ]
+
+
+def is_up_to_date(media_root, image_name, widths):
+    """Варианты пишутся по порядку, последний служит меткой готовности."""
+    source = os.path.join(media_root, image_name)
+    marker = os.path.join(media_root, variant_names(image_name, widths)[-1])
+    try:
+        return os.path.getmtime(marker) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+def render_variants(media_root, image_name, widths, quality=80, force=False):
+    """Режет исходник под карточку и сохраняет все ширины в WebP и JPEG.
+
+    Не обращается к настройкам Django, поэтому годится для
+    ``ProcessPoolExecutor``. Возвращает False, если всё уже было готово.
+    """
+    widths = sorted(widths)
+    if not force and is_up_to_date(media_root, image_name, widths):
+        return False
+    with Image.open(os.path.join(media_root, image_name)) as image:
+        largest = widths[-1]
+        image.draft('RGB', (largest, round(largest * RATIO)))
+        image = image.convert('RGB')
+        crop_height = min(image.height, round(image.width * RATIO))
+        crop_width = round(crop_height / RATIO)
+        left = (image.width - crop_width) // 2
+        top = (image.height - crop_height) // 2
+        image = image.crop((left, top, left + crop_width, top + crop_height))
+        for width in widths:
+            resized = image.resize(
+                (width, round(width * RATIO)),
+                Image.LANCZOS
+            )
+            for extension, image_format in FORMATS:
+                path = os.path.join(
+                    media_root,
+                    variant_name(image_name, width, extension)
+                )
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                resized.save(path, image_format, quality=quality)
+    return True
+
+
+def generate_variants(image_name, force=False):
+    return render_variants(
+        settings.MEDIA_ROOT,
+        image_name,
+        settings.IMAGE_VARIANT_WIDTHS,
+        force=force
+    )
+
+
+def variant_urls(image_name):
+    """{'webp': {320: url, ...}, 'jpg': {...}} или None, пока не готово.
+
+    Готовые адреса живут в кэше: файловая система проверяется, только
+    пока варианты ещё не созданы.
+    """
+    widths = sorted(settings.IMAGE_VARIANT_WIDTHS)
+    key = f'variants:{image_name}:{"-".join(map(str, widths))}'
+    urls = cache.get(key)
+    if urls is None:
+        if not is_up_to_date(settings.MEDIA_ROOT, image_name, widths):
+            return None
+        urls = {
+            extension: {
+                width: settings.MEDIA_URL + variant_name(
+                    image_name, width, extension
+                )
+                for width in widths
+            }
+            for extension, _ in FORMATS
+        }
+        cache.set(key, urls, None)
+    return urls
+
+
+def srcsets(image):
+    """{'webp': 'url 320w, ...', 'jpg': ..., 'src': самый широкий JPEG}.
+
+    None, если варианты ещё не готовы.
+    """
+    urls = variant_urls(image.name) if image else None
+    if urls is None:
+        return None
+    result = {
+        extension: ', '.join(
+            f'{url} {width}w' for width, url in sorted(by_width.items())
+        )
+        for extension, by_width in urls.items()
+    }
+    # браузер без srcset не должен качать исходник целиком
+    result['src'] = urls['jpg'][max(urls['jpg'])]
+    return result
@@ -1,71 +1,152 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
 from yatube.settings import COMMENT_PER_PAGE, PAGINATOR
 
+from .archive import archived_follow_feed, get_post_or_404
+from .cache import anonymous_page_cache, feed_cache, scoped_cache
+from . import live
+from .feed import follow_feed
+from .feeds import groups_scope
+from .following import add_followed, followed_ids, remove_followed
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
+from .models import ArchivedPost, Follow, Group, GroupStats, Post
+from .paginators import CursorPaginator, paginate
+from .ratelimit import ratelimit
+from .recommendations import recommended_authors
+from .search import search_page
+from .sqlite import retry_on_locked
+from .trending import trending_groups, trending_posts
 
 User = get_user_model()
 
 
+@anonymous_page_cache()
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+    page = paginate(
+        request, post_list, PAGINATOR, ArchivedPost.objects.for_feed()
+    )
     return render(
         request,
         'index.html',
-        {'page': page}
+        {'page': page, **feed_cache(request, 'index', page)}
     )
 
 
+@anonymous_page_cache()
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'group.html', {'group': group, 'page': page})
+    posts = group.posts.for_feed()
+    page = paginate(
+        request, posts, PAGINATOR, group.archived_posts.for_feed()
+    )
+    return render(
+        request,
+        'group.html',
+        {
+            'group': group,
+            'page': page,
+            **feed_cache(request, f'group:{group.pk}', page)
+        }
+    )
+
+
+@scoped_cache(groups_scope, anonymous_only=True)
+def group_index(request):
+    # всё для карточки группы лежит в GroupStats: без COUNT и MAX на группу
+    stats = GroupStats.objects.select_related(
+        'group', 'last_post__author'
+    ).order_by('-last_activity', 'pk')
+    page = Paginator(stats, PAGINATOR).get_page(request.GET.get('page'))
+    return render(request, 'groups.html', {'page': page})
+
+
+@anonymous_page_cache()
+def trending(request):
+    # порядок по score не меняется со временем, поэтому страница
+    # живёт в кэше до следующей записи, как и обычные ленты
+    return render(request, 'trending.html', {
+        'posts': trending_posts(),
+        'groups': trending_groups(),
+    })
+
+
+@anonymous_page_cache()
+def group_trending(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return render(request, 'trending.html', {
+        'group': group,
+        'posts': trending_posts(group),
+    })
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = search_page(request, query, PAGINATOR) if query else None
+    return render(request, 'search.html', {'query': query, 'page': page})
+
+
+@retry_on_locked
+def save_locked(obj):
+    """Сохраняет форму или объект в транзакции с блокировкой на запись.
+
+    Проверка формы и обработка картинки идут до вызова, поэтому
+    блокировка SQLite держится только на время самих INSERT и UPDATE.
+    """
+    return obj.save()
 
 
 @login_required
+@ratelimit('new_post', methods=('POST',))
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None,)
     if form.is_valid():
         form.instance.author = request.user
-        form.save()
+        save_locked(form)
         return redirect('index')
 
     return render(request, 'new_post.html', {'form': form})
 
 
+@anonymous_page_cache()
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    following = request.user.is_authenticated and Follow.objects.filter(
-        author=author,
-        user=request.user).exists()
-    paginator = Paginator(posts, PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
+    )
+    posts = author.posts.for_feed()
+    # состояние подписки author_card.html берёт из кэша (posts.following)
+    page = paginate(
+        request, posts, PAGINATOR, author.archived_posts.for_feed()
+    )
     return render(
         request,
         'profile.html',
-        {'author': author, 'page': page, 'following': following}
+        {
+            'author': author,
+            'page': page,
+            'recommendations': recommended_authors(request.user),
+            **feed_cache(request, f'profile:{author.pk}', page)
+        }
     )
 
 
+@anonymous_page_cache()
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id, author__username=username)
-    comments = post.comments.all()
-    form = CommentForm()
-    paginator = Paginator(comments, COMMENT_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post = get_post_or_404(
+        Post.objects.for_feed().select_related('author__stats'),
+        ArchivedPost.objects.for_feed().select_related('author__stats'),
+        id=post_id,
+        author__username=username
+    )
+    form = None if getattr(post, 'is_archived', False) else CommentForm()
+    page = comments_page(request, post)
     return render(
         request,
         'view_post.html',
@@ -73,12 +154,50 @@ def post_view(request, username, post_id):
             'author': post.author,
             'post': post,
             'page': page,
-            'comments': comments,
             'form': form
         }
     )
 
 
+def comments_page(request, post):
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENT_PER_PAGE,
+        fields=('created', 'id')
+    )
+    return paginator.get_page(request.GET.get('after'))
+
+
+@anonymous_page_cache()
+def post_comments(request, username, post_id):
+    """Следующая порция комментариев: HTML-фрагмент или JSON."""
+    post = get_post_or_404(
+        Post.objects.select_related('author'),
+        ArchivedPost.objects.select_related('author'),
+        id=post_id,
+        author__username=username
+    )
+    page = comments_page(request, post)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in page
+            ],
+            'next': page.next_cursor,
+        })
+    return render(
+        request,
+        'includes/comment_list.html',
+        {'post': post, 'page': page}
+    )
+
+
 @login_required
 def post_edit(request, username, post_id):
     post = get_object_or_404(Post, id=post_id, author__username=username)
@@ -90,12 +209,13 @@ def post_edit(request, username, post_id):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        save_locked(form)
         return redirect('post', username, post_id)
     return render(request, 'new_post.html', {'form': form, 'post': post})
 
 
 @login_required
+@ratelimit('add_comment')
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, id=post_id, author__username=username)
     form = CommentForm(request.POST)
@@ -103,7 +223,7 @@ def add_comment(request, username, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        save_locked(comment)
     return redirect('post', username, post_id)
 
 
@@ -122,27 +242,83 @@ def server_error(request):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, "follow.html", {'page': page})
+    post_list = follow_feed(request.user).for_feed()
+    page = paginate(
+        request, post_list, PAGINATOR,
+        archived_follow_feed(request.user).for_feed()
+    )
+    return render(
+        request,
+        "follow.html",
+        {
+            'page': page,
+            'recommendations': recommended_authors(request.user),
+            **feed_cache(request, 'follow', page)
+        }
+    )
+
+
+def live_posts(request):
+    """Сообщает о новых постах в ленте index или follow.
+
+    По умолчанию это поток SSE, с ``?mode=poll`` — long-poll с JSON.
+    Отсчёт идёт от Last-Event-ID, ``?since=`` или последнего поста.
+    Соединение занимает поток сервера до LIVE_STREAM_TIMEOUT, поэтому
+    нужен многопоточный или асинхронный сервер, а анонимы получают 204.
+    """
+    if not request.user.is_authenticated:
+        # каждый поток держит воркер, анонимам их не раздаём;
+        # 204 останавливает переподключения EventSource
+        return HttpResponse(status=204)
+    author_ids = None
+    if request.GET.get('feed') == 'follow':
+        author_ids = followed_ids(request.user.pk)
+    since = request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('since')
+    since = int(since) if since and since.isdigit() else live.latest_post_id()
+    if request.GET.get('mode') == 'poll':
+        count, last_id = live.wait_for_posts(
+            since, author_ids, settings.LIVE_LONG_POLL_TIMEOUT
+        )
+        return JsonResponse({'count': count, 'last_id': last_id})
+    response = StreamingHttpResponse(
+        live.event_stream(since, author_ids),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@retry_on_locked
+def follow(user, author):
+    # пишем всегда: кэш подписок может отставать от базы, а ошибка
+    # уникальности или пустой DELETE заодно его поправят
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        add_followed(user.pk, author.pk)
+
+
+@retry_on_locked
+def unfollow(user, author):
+    deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+    if not deleted:
+        remove_followed(user.pk, author.pk)
 
 
 @login_required
+@ratelimit('profile_follow')
 def profile_follow(request, username):
     author = User.objects.get(username=username)
-    if request.user == author:
-        return redirect('profile', username)
-    if not Follow.objects.filter(user=request.user, author=author).exists():
-        Follow.objects.create(user=request.user, author=author)
+    if request.user != author:
+        follow(request.user, author)
     return redirect('profile', username)
 
 
 @login_required
+@ratelimit('profile_unfollow')
 def profile_unfollow(request, username):
     author = User.objects.get(username=username)
-    follow = Follow.objects.filter(user=request.user, author=author)
-    if follow.exists():
-        follow.delete()
+    unfollow(request.user, author)
     return redirect('profile', username)
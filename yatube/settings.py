@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -25,6 +26,9 @@ SECRET_KEY = 'vsw8wxi7l22_vwm6i(@2e5ew=_h_yen-*)4t=22(15j6gjf6v1'
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Запуск тестов: manage.py test или pytest
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
@@ -38,6 +42,7 @@ ALLOWED_HOSTS = [
 INSTALLED_APPS = [
     'users',
     'posts',
+    'api',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -48,6 +53,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'posts.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,11 +91,31 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # обычный sqlite3 плюс прагмы и BEGIN IMMEDIATE (posts.sqlite)
+        'ENGINE': 'posts.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # соединение живёт между запросами, а не открывается на каждый
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            # сколько секунд ждать чужую запись, прежде чем падать
+            'timeout': 20,
+        },
     }
 }
 
+# Выполняются на каждом новом соединении SQLite:
+# WAL не даёт читателям ждать писателя, NORMAL безопасен в режиме WAL
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+# Повторы записей, упавших с «database is locked»: 50, 100, 200... мс
+SQLITE_WRITE_RETRIES = 5
+SQLITE_RETRY_DELAY = 0.05
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -146,10 +172,132 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 PAGINATOR = 10
 
+# Keyset-паджинация лент по ?after=/?before= вместо ?page=N
+CURSOR_PAGINATION = False
+
 COMMENT_PER_PAGE = 4
 
+# Лента подписок: посты авторов с числом подписчиков не больше
+# FEED_FANOUT_LIMIT раскладываются по лентам при записи, посты более
+# популярных авторов подмешиваются при чтении. При подписке в ленту
+# попадают все посты автора из Post: старые уже лежат в архиве
+FEED_FANOUT_LIMIT = 1000
+
+# Рекомендации «кого подписаться» (posts.recommendations): сколько
+# хранить на пользователя и показывать на странице, вес co-follow
+# относительно общих подписок. Пересчёт — build_recommendations
+RECOMMENDATIONS_PER_USER = 20
+RECOMMENDATIONS_SHOWN = 5
+RECOMMENDATION_COFOLLOW_WEIGHT = 0.5
+
+# Популярное (posts.trending): вклад поста и комментария в оценку
+# вдвое угасает за TRENDING_HALF_LIFE секунд; decay_trending удаляет
+# строки, угасшие ниже TRENDING_MIN_SCORE. На странице TRENDING_SIZE
+TRENDING_HALF_LIFE = 60 * 60 * 12
+TRENDING_POST_WEIGHT = 1.0
+TRENDING_COMMENT_WEIGHT = 2.0
+TRENDING_MIN_SCORE = 0.01
+TRENDING_SIZE = 20
+
+# Посты старше ARCHIVE_AFTER_DAYS дней команда archive_posts переносит
+# в архивные таблицы; ленты и страницы постов читают архив после Post
+ARCHIVE_AFTER_DAYS = 90
+
+# Сколько SQL-запросов может выполнить view (по имени url вместе
+# с пространством имён, например api:index),
+# превышение пишется в лог posts.middleware. Архивный пост и страница
+# на границе архива стоят на запрос больше горячих
+QUERY_BUDGETS = {
+    'index': 8,
+    'group': 8,
+    'profile': 9,
+    'post': 8,
+    'post_comments': 5,
+    'groups': 4,
+    'trending': 4,
+    'group_trending': 4,
+    'follow_index': 11,
+    'new_post': 13,
+    'post_edit': 10,
+    'add_comment': 13,
+    'profile_follow': 12,
+    'profile_unfollow': 12,
+    'api:index': 4,
+    'api:group': 5,
+    'api:profile': 5,
+    'api:post': 4,
+    'api:post_comments': 4,
+    'api:follow_index': 7,
+}
+
+# Фрагменты лент живут долго: при записи Post/Comment/Follow
+# версия ключей сдвигается и старые записи перестают читаться. Долгие
+# сроки безопасны, только пока кэш общий для всех воркеров (см. CACHES)
+FEED_CACHE_TIMEOUT = 60 * 60 * 4
+# Множества авторов, на которых подписан пользователь (posts.following),
+# правятся на месте при подписке и отписке
+FOLLOWING_CACHE_TIMEOUT = 60 * 60
+# Целые страницы для анонимов, инвалидируются той же версией
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Сколько последних записей попадает в RSS/Atom-ленты; они кэшируются
+# до следующей записи в своей области: сайт, группа или автор
+SYNDICATION_ITEMS = 20
+
+# Уведомления о новых постах (posts.live): поток SSE живёт
+# LIVE_STREAM_TIMEOUT секунд и шлёт ping раз в LIVE_HEARTBEAT, посты
+# других воркеров ищутся в базе раз в LIVE_POLL_INTERVAL. Открытый поток
+# или long-poll занимает поток сервера на всё время ожидания: SSE нужен
+# многопоточный или асинхронный сервер (gunicorn с gthread или gevent),
+# а синхронные воркеры быстро кончатся. Поэтому плашку новых записей
+# видят только вошедшие пользователи
+LIVE_STREAM_TIMEOUT = 55
+LIVE_HEARTBEAT = 15
+LIVE_POLL_INTERVAL = 5
+# Сколько держать long-poll запрос без новых постов
+LIVE_LONG_POLL_TIMEOUT = 25
+
+# Token bucket для записей (posts.ratelimit): '20/m' — ведро на 20
+# запросов, полностью пополняется за минуту; отдельно на пользователя
+# и на IP. Превышение отвечает 429 с Retry-After
+RATELIMIT_ENABLED = True
+RATELIMITS = {
+    'new_post': {'user': '10/m', 'ip': '30/m'},
+    'add_comment': {'user': '20/m', 'ip': '60/m'},
+    'profile_follow': {'user': '30/m', 'ip': '90/m'},
+    'profile_unfollow': {'user': '30/m', 'ip': '90/m'},
+}
+
+# Загрузки всегда пишутся на диск кусками, а не собираются в памяти
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Ограничения картинок постов: больше POST_IMAGE_MAX_SIDE уменьшается,
+# больше лимитов по байтам и пикселям отклоняется до распаковки
+POST_IMAGE_MAX_BYTES = 20 * 1024 * 1024
+POST_IMAGE_MAX_SIDE = 2560
+POST_IMAGE_MAX_PIXELS = 40_000_000
+POST_IMAGE_MAX_DRAFT_PIXELS = 150_000_000
+
+# Потоки фоновой генерации миниатюр постов. При 0 миниатюры создаются
+# сразу в вызывающем потоке; так в тестах, чтобы пул не писал в SQLite
+# посреди их транзакций
+THUMBNAIL_WORKERS = 0 if TESTING else 2
+# Ширины WebP/JPEG-вариантов картинок постов для srcset
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+
+# Версии ключей (posts.cache), множества подписок и ведра rate limit
+# должны быть общими для всех процессов: LocMemCache живёт в одном
+# воркере, и сдвиг версии в нём не доходит до остальных. Memcached общий
+# для всех машин, инкрементирует атомарно и вытесняет по LRU, а не
+# случайно, как файловый кэш. В тестах кэш остаётся в памяти.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
     }
 }
+if TESTING:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
@@ -24,6 +24,7 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('adm/', admin.site.urls),
+    path('api/v1/', include('api.urls', namespace='api')),
     path('', include('posts.urls')),
 ]
 